@@ -0,0 +1,142 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from FoodCatalog import FoodCatalog
+from Instrumentation import Instrumentation
+from MealPlanGenerator import MealPlanGenerator, _planejar_refeicao
+
+
+class AsyncMealPlanner:
+    """Fachada asyncio do MealPlanGenerator que não bloqueia o event loop.
+
+    Cada refeição roda em um pool: processos por padrão, com os catálogos
+    carregados em cada worker; "thread"; ou uma instância de
+    concurrent.futures.Executor compartilhada, que não é encerrada por
+    `fechar`. No event loop ficam só a preparação das metas (milissegundos) e
+    a montagem do resultado.
+
+    `gerar_refeicoes` entrega cada refeição assim que o planner dela termina;
+    `gerar_cardapio_async` espera as seis e devolve o MealPlanGenerator pronto
+    para gerar_markdown_final/gerar_plano; `gerar_lote` planeja vários
+    pacientes com concorrência limitada, entregando-os na ordem de conclusão.
+
+    Com `timeout` (segundos por paciente) estoura asyncio.TimeoutError. Em
+    timeout ou cancelamento, as refeições que ainda não começaram são
+    canceladas; as que já estão rodando em um worker terminam em segundo
+    plano e têm o resultado descartado.
+    """
+
+    def __init__(self, executor="process", max_workers=None, timeout=None, seed=None,
+                 run_kwargs=None, plan_cache=None):
+        self.executor = executor
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.seed = seed
+        self.run_kwargs = run_kwargs or {}
+        self.plan_cache = plan_cache
+        self._pool = None
+
+    def _executor(self):
+        if isinstance(self.executor, Executor):
+            return self.executor
+        if self._pool is None:
+            if self.executor == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=FoodCatalog.preload)
+            elif self.executor == "thread":
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            else:
+                raise ValueError(f"Executor '{self.executor}' inválido. Use 'process', 'thread' ou um Executor.")
+        return self._pool
+
+    def fechar(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.fechar()
+
+    def _generator(self, paciente):
+        if isinstance(paciente, MealPlanGenerator):
+            return paciente
+        return MealPlanGenerator(paciente, seed=self.seed, plan_cache=self.plan_cache, run_kwargs=self.run_kwargs)
+
+    async def gerar_refeicoes(self, paciente, timeout=None):
+        """Gera (refeição, resultado) na ordem em que os planners terminam.
+
+        `paciente` pode ser um Paciente ou um MealPlanGenerator já criado; os
+        resultados têm o formato de refeicoes_dict. Refeições resolvidas pelo
+        PlanCache saem primeiro.
+        """
+        loop = asyncio.get_running_loop()
+        timeout = self.timeout if timeout is None else timeout
+        prazo = None if timeout is None else loop.time() + timeout
+        generator = self._generator(paciente)
+
+        prontos, tarefas = generator.preparar_refeicoes()
+        instrumentar = Instrumentation.ativo
+        pendentes = {}
+        for ref, tarefa in tarefas.items():
+            futuro = loop.run_in_executor(self._executor(), _planejar_refeicao,
+                                          tarefa[2], generator.run_kwargs, instrumentar)
+            pendentes[futuro] = (ref, tarefa)
+
+        try:
+            for ref, resultado in prontos.items():
+                yield ref, resultado
+            while pendentes:
+                restante = None if prazo is None else prazo - loop.time()
+                if restante is not None and restante <= 0:
+                    raise asyncio.TimeoutError()
+                concluidos, _ = await asyncio.wait(pendentes, timeout=restante,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for futuro in concluidos:
+                    ref, tarefa = pendentes.pop(futuro)
+                    foods, run_info = futuro.result()
+                    yield ref, generator.concluir_refeicao(ref, tarefa, foods, run_info)
+        finally:
+            for futuro in pendentes:
+                futuro.cancel()
+
+    async def gerar_cardapio_async(self, paciente, timeout=None):
+        """Equivalente assíncrono de gerar_cardapio; retorna o MealPlanGenerator preenchido."""
+        generator = self._generator(paciente)
+        generator.definir_refeicoes({ref: resultado async for ref, resultado in self.gerar_refeicoes(generator, timeout)})
+        return generator
+
+    async def gerar_lote(self, pacientes, concorrencia=None, timeout=None):
+        """Planeja os pacientes com no máximo `concorrencia` em andamento.
+
+        Gera (índice, MealPlanGenerator, erro) na ordem de conclusão; a falha
+        ou o timeout de um paciente vira `erro` e não interrompe o lote.
+        """
+        concorrencia = concorrencia or self.max_workers
+        pacientes = iter(enumerate(pacientes))
+        tarefas = {}
+
+        def proxima():
+            for indice, paciente in pacientes:
+                tarefa = asyncio.ensure_future(self.gerar_cardapio_async(paciente, timeout))
+                tarefas[tarefa] = indice
+                return True
+            return False
+
+        try:
+            while len(tarefas) < concorrencia and proxima():
+                pass
+            while tarefas:
+                concluidas, _ = await asyncio.wait(tarefas, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in concluidas:
+                    indice = tarefas.pop(tarefa)
+                    erro = tarefa.exception()
+                    yield indice, None if erro else tarefa.result(), erro
+                    proxima()
+        finally:
+            # Consumidor parou antes do fim: cancela e espera as tarefas restantes
+            for tarefa in tarefas:
+                tarefa.cancel()
+            await asyncio.gather(*tarefas, return_exceptions=True)
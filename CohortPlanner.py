@@ -0,0 +1,186 @@
+import argparse
+import csv
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from FoodCatalog import FoodCatalog
+from HealthUtils import HealthUtils
+from Instrumentation import Instrumentation
+from MealPlanGenerator import MealPlanGenerator
+from PlanExporter import JsonlPlanExporter, ColumnarPlanExporter
+
+
+def _inicializar_worker():
+    """Carrega os catálogos uma vez por processo, antes do primeiro paciente."""
+    FoodCatalog.preload()
+
+
+def _nome_arquivo(indice, nome):
+    nome = re.sub(r"[^\w-]+", "_", str(nome)).strip("_") or "paciente"
+    return f"{indice:05d}_{nome}.md"
+
+
+def _planejar_paciente(indice, paciente, saida_dir, exportar=False, instrumentar=False, seed=None,
+                       run_kwargs=None):
+    """Gera e grava o cardápio de um paciente; erros viram um registro no resumo.
+
+    Com `exportar`, o registro leva também o plano estruturado em "plano"; com
+    `instrumentar`, os registros da Instrumentation do paciente em "metricas".
+    `seed` e `run_kwargs` vão para o MealPlanGenerator.
+    """
+    if instrumentar:
+        Instrumentation.ativar()
+    inicio = time.perf_counter()
+    registro = {"indice": indice, "nome": paciente.nome, "arquivo": "", "status": "ok", "erro": ""}
+    try:
+        generator = MealPlanGenerator(paciente, seed=seed, run_kwargs=run_kwargs)
+        generator.gerar_cardapio()
+
+        # Escreve direto no arquivo, sem montar o documento inteiro em memória
+        arquivo = os.path.join(saida_dir, _nome_arquivo(indice, paciente.nome))
+        with open(arquivo, "w", encoding="utf-8") as f:
+            generator.escrever_markdown(f)
+        registro["arquivo"] = arquivo
+
+        if exportar:
+            registro["plano"] = {"indice": indice, **generator.gerar_plano()}
+    except Exception as e:
+        registro["status"] = "erro"
+        registro["erro"] = f"{type(e).__name__}: {e}"
+    registro["segundos"] = round(time.perf_counter() - inicio, 3)
+    if instrumentar:
+        registro["metricas"] = Instrumentation.coletar()
+    return registro
+
+
+class CohortPlanner:
+    """Gera os cardápios de todos os pacientes de um CSV, em paralelo.
+
+    Os pacientes são lidos em blocos de `chunksize` linhas e distribuídos
+    em um ProcessPoolExecutor (um worker por núcleo por padrão). Cada
+    paciente gera um markdown em `saida_dir` e uma linha em `resumo.csv`;
+    a falha de um paciente não interrompe o lote. Com `max_workers=0` tudo
+    roda no processo atual.
+
+    `jsonl` e `colunar` são caminhos opcionais onde os planos estruturados
+    são anexados à medida que os pacientes terminam (ver PlanExporter).
+    Com `metricas`, o lote roda instrumentado e grava ali as métricas da
+    Instrumentation: JSON Lines se o caminho terminar em .jsonl, texto do
+    Prometheus caso contrário.
+
+    Com `seed`, o lote é reprodutível (e cada refeição tem chave de cache
+    estável); `run_kwargs` vai para o GeneticMealPlanner.run de cada refeição,
+    por exemplo {"solver": "auto"}.
+    """
+
+    RESUMO = "resumo.csv"
+
+    def __init__(self, pacientes_csv, saida_dir="cardapios", max_workers=None, chunksize=1000,
+                 jsonl=None, colunar=None, metricas=None, seed=None, run_kwargs=None):
+        self.pacientes_csv = pacientes_csv
+        self.saida_dir = saida_dir
+        self.max_workers = os.cpu_count() if max_workers is None else max_workers
+        self.chunksize = chunksize
+        self.jsonl = jsonl
+        self.colunar = colunar
+        self.metricas = metricas
+        self.seed = seed
+        self.run_kwargs = run_kwargs or {}
+
+    def _pacientes(self):
+        """Percorre o CSV em blocos, gerando (índice da linha, Paciente)."""
+        return HealthUtils.carregar_pacientes(self.pacientes_csv, self.chunksize)
+
+    def _executar_serial(self):
+        _inicializar_worker()
+        for indice, paciente in self._pacientes():
+            yield _planejar_paciente(indice, paciente, self.saida_dir, self._exportar, bool(self.metricas),
+                                     self.seed, self.run_kwargs)
+
+    def _executar_paralelo(self):
+        # Mantém no máximo algumas tarefas por worker na fila, para não materializar o CSV inteiro
+        limite = self.max_workers * 4
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_inicializar_worker) as executor:
+            pendentes = {}
+            for indice, paciente in self._pacientes():
+                future = executor.submit(_planejar_paciente, indice, paciente, self.saida_dir, self._exportar,
+                                         bool(self.metricas), self.seed, self.run_kwargs)
+                pendentes[future] = (indice, paciente.nome)
+                if len(pendentes) >= limite:
+                    concluidos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for future in concluidos:
+                        yield self._resultado(future, *pendentes.pop(future))
+            for future in list(pendentes):
+                yield self._resultado(future, *pendentes.pop(future))
+
+    @property
+    def _exportar(self):
+        return bool(self.jsonl or self.colunar)
+
+    @staticmethod
+    def _resultado(future, indice, nome):
+        try:
+            return future.result()
+        except Exception as e:
+            # Falha fora do try do worker (ex.: processo encerrado ou erro de pickle)
+            return {"indice": indice, "nome": nome, "arquivo": "", "status": "erro",
+                    "erro": f"{type(e).__name__}: {e}", "segundos": 0.0}
+
+    def executar(self):
+        """Planeja todo o CSV e retorna a lista de registros do resumo."""
+        os.makedirs(self.saida_dir, exist_ok=True)
+        resultados = self._executar_serial() if self.max_workers == 0 else self._executar_paralelo()
+
+        exportadores = []
+        if self.jsonl:
+            exportadores.append(JsonlPlanExporter(self.jsonl))
+        if self.colunar:
+            exportadores.append(ColumnarPlanExporter(self.colunar))
+
+        registros = []
+        caminho_resumo = os.path.join(self.saida_dir, self.RESUMO)
+        try:
+            with open(caminho_resumo, "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=["indice", "nome", "status", "segundos", "arquivo", "erro"])
+                writer.writeheader()
+                for registro in resultados:
+                    for metrica in registro.pop("metricas", []):
+                        Instrumentation.registrar(**metrica)
+                    plano = registro.pop("plano", None)
+                    if plano is not None:
+                        for exportador in exportadores:
+                            exportador.escrever(plano)
+                    writer.writerow(registro)
+                    registros.append(registro)
+        finally:
+            for exportador in exportadores:
+                exportador.fechar()
+
+        if self.metricas:
+            if self.metricas.endswith(".jsonl"):
+                Instrumentation.salvar_jsonl(self.metricas)
+            else:
+                Instrumentation.salvar_prometheus(self.metricas)
+        return registros
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera cardápios para todos os pacientes de um CSV.")
+    parser.add_argument("pacientes_csv", nargs="?", default="pacientes_ro.csv")
+    parser.add_argument("--saida", default="cardapios", help="diretório dos markdowns e do resumo")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: núcleos; 0 = serial)")
+    parser.add_argument("--chunksize", type=int, default=1000, help="linhas do CSV lidas por vez")
+    parser.add_argument("--jsonl", default=None, help="exporta os planos estruturados em JSON Lines")
+    parser.add_argument("--colunar", default=None, help="exporta uma linha por refeição em Parquet (ou CSV)")
+    parser.add_argument("--metricas", default=None, help="grava métricas por fase (.jsonl ou texto Prometheus)")
+    parser.add_argument("--seed", type=int, default=None, help="seed base para um lote reprodutível")
+    parser.add_argument("--solver", default=None, help="solver do GeneticMealPlanner (padrão: o do run)")
+    args = parser.parse_args()
+
+    run_kwargs = {"solver": args.solver} if args.solver else {}
+    registros = CohortPlanner(args.pacientes_csv, args.saida, args.workers, args.chunksize,
+                              args.jsonl, args.colunar, args.metricas, args.seed, run_kwargs).executar()
+    erros = sum(r["status"] == "erro" for r in registros)
+    print(f"{len(registros) - erros} cardápios gerados em {args.saida} ({erros} com erro)")
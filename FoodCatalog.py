@@ -0,0 +1,86 @@
+import os
+import numpy as np
+import pandas as pd
+from HealthUtils import HealthUtils
+
+
+class FoodCatalog:
+    """Cache de processo para as tabelas de alimentos e saladas (CSV).
+
+    Cada arquivo é lido uma única vez por processo e relido apenas quando o
+    mtime muda. Os DataFrames entregues são visões rasas do cache e não devem
+    ser modificados.
+
+    Na carga também é calculada a máscara de restrições de cada alimento
+    (`HealthUtils.bits_alimentos`), de modo que filtrar uma combinação de
+    restrições é um único AND bit a bit. Os índices resultantes ficam em
+    cache por arquivo e combinação.
+    """
+
+    # Tabela de alimentos usada por cada refeição
+    MEAL_FILES = {
+        "cafe_da_manha": "cafe_da_manha.csv",
+        "lanche_tarde": "cafe_da_manha.csv",
+        "almoco": "almoco_jantar.csv",
+        "jantar": "almoco_jantar.csv",
+        "lanche_manha": "lanche_ceia.csv",
+        "ceia": "lanche_ceia.csv",
+    }
+
+    SALADS_FILE = "saladas.csv"
+
+    _entries = {}
+
+    @classmethod
+    def meal_file(cls, refeicao):
+        if refeicao not in cls.MEAL_FILES:
+            raise ValueError(f"Refeição '{refeicao}' não reconhecida")
+        return cls.MEAL_FILES[refeicao]
+
+    @classmethod
+    def load(cls, path):
+        return cls._entry(path)["df"].copy(deep=False)
+
+    @classmethod
+    def restricted(cls, path, restricao):
+        """Alimentos de `path` permitidos para a restrição (ou combinação, "vegano,gluten")."""
+        entry = cls._entry(path)
+        bits = HealthUtils.bits_restricao(restricao)
+        indices = entry["indices"].get(bits)
+        if indices is None:
+            indices = np.flatnonzero((entry["flags"] & bits) == 0)
+            entry["indices"][bits] = indices
+        return entry["df"].iloc[indices]
+
+    @classmethod
+    def by_ids(cls, path, food_ids):
+        """Linhas de `path` com os ids informados, na ordem do arquivo."""
+        df = cls._entry(path)["df"]
+        return df[df["id"].isin(food_ids)]
+
+    @classmethod
+    def version(cls, path):
+        """Versão (mtime) do arquivo, carregando-o se ainda não estiver em cache."""
+        return cls._entry(path)["mtime"]
+
+    @classmethod
+    def _entry(cls, path):
+        key = os.path.abspath(path)
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+
+        entry = cls._entries.get(key)
+        if entry is None or entry["mtime"] != mtime:
+            df = pd.read_csv(path)
+            entry = {"mtime": mtime, "df": df, "flags": HealthUtils.bits_alimentos(df), "indices": {}}
+            cls._entries[key] = entry
+        return entry
+
+    @classmethod
+    def preload(cls, paths=None):
+        """Carrega os catálogos de uma vez (padrão: os de todas as refeições e o de saladas)."""
+        for path in paths or sorted(set(cls.MEAL_FILES.values())) + [cls.SALADS_FILE]:
+            cls._entry(path)
+
+    @classmethod
+    def clear(cls):
+        cls._entries.clear()
@@ -1,6 +1,49 @@
+import time
+import numpy as np
 import pandas as pd
-import random
+from collections import OrderedDict
 from HealthUtils import HealthUtils
+from FoodCatalog import FoodCatalog
+
+
+class _EarlyStopping:
+    """Critérios de parada do AG, avaliados ao fim de cada geração.
+
+    - patience: gerações seguidas sem melhorar o melhor fitness já visto;
+    - target_fitness/tol: para quando o melhor fitness chega a target_fitness - tol;
+    - deadline_ms: tempo máximo de parede desde o início da execução.
+
+    Com `history`, guarda (segundos desde o início, melhor fitness) a cada geração;
+    a enumeração exaustiva registra um único ponto, ao final.
+    """
+
+    def __init__(self, patience=None, target_fitness=None, tol=0.0, deadline_ms=None, history=False):
+        self.patience = patience
+        self.target_fitness = target_fitness
+        self.tol = tol
+        self.start = time.perf_counter()
+        self.deadline = self.start + deadline_ms / 1000 if deadline_ms is not None else None
+        self.best = -np.inf
+        self.stagnant = 0
+        self.history = [] if history else None
+
+    def update(self, best_fitness):
+        """Registra o melhor fitness da geração e retorna o motivo da parada, ou None."""
+        if best_fitness > self.best:
+            self.best = best_fitness
+            self.stagnant = 0
+        else:
+            self.stagnant += 1
+        if self.history is not None:
+            self.history.append((time.perf_counter() - self.start, float(self.best)))
+
+        if self.target_fitness is not None and self.best >= self.target_fitness - self.tol:
+            return "target"
+        if self.patience is not None and self.stagnant >= self.patience:
+            return "patience"
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return "deadline"
+        return None
 
 
 class GeneticMealPlanner:
@@ -17,12 +60,25 @@ class GeneticMealPlanner:
         "lanche_tarde": ["frutas_e_derivados", ["leite_e_derivados", "ovos_e_derivados"]],
     }
 
+    # Probabilidade de um indivíduo sofrer mutação em um de seus slots
+    MUTATION_RATE = 0.2
+    # Melhores indivíduos copiados sem alteração para a geração seguinte
+    ELITE_SIZE = 2
+
+    # Acima deste número de combinações o solver "auto" recorre ao AG
+    EXHAUSTIVE_THRESHOLD = 50_000
+    # Combinações avaliadas por vez na enumeração exaustiva
+    EXHAUSTIVE_CHUNK = 8192
+
+    # Colunas da matriz de nutrientes, na ordem usada pelo fitness
+    NUTRIENT_COLUMNS = ["kcal", "protein_g", "fat_g", "fiber_g", "iron_mg", "sodium_mg", "carbs_g"]
+
     def __init__(self, refeicao="cafe_da_manha", restricao=None,
                  target_kcal=500, target_protein_g=None,
                  target_carbs_g=None, target_fat_g=None,
                  nivel_triglicerideos=None,
                  nivel_hdl=None, nivel_ldl=None, nivel_ferro=None,
-                 target_fibers_g=None, objetivo=None):
+                 target_fibers_g=None, objetivo=None, cache_size=4096, seed=None):
         self.refeicao = refeicao
         self.restricao = restricao
         self.target_kcal = target_kcal
@@ -36,30 +92,96 @@ class GeneticMealPlanner:
         self.target_fibers_g = target_fibers_g
         self.objetivo = objetivo
 
+        # Único gerador de números aleatórios do planner; `seed` torna a execução reprodutível
+        self.rng = np.random.default_rng(seed)
+
+        # Tempo de parede (s) de cada fase: load_foods, build e, após run(), run
+        start = time.perf_counter()
         self.foods = self._load_foods()
+        self.timings = {"load_foods": time.perf_counter() - start}
+
+        start = time.perf_counter()
         self.required_cats = self._get_required_categories()
+        self._build_nutrient_matrix()
+        self._build_category_index()
+        self._build_slot_tables()
+        self.timings["build"] = time.perf_counter() - start
+
+        # Cache LRU de fitness por cromossomo (tupla ordenada de ids); 0 desativa
+        self.cache_size = cache_size
+        self._fitness_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Indivíduos efetivamente pontuados (fora do cache), em todos os solvers
+        self.evaluations = 0
+
+        # Resumo da última execução de run(): solver, gerações e motivo da parada
+        self.run_info = {}
+
+    @property
+    def cache_hit_rate(self):
+        total = self.cache_hits + self.cache_misses
+        return self.cache_hits / total if total else 0.0
 
     # =============================
     # Carregamento de alimentos
     # =============================
     def _load_foods(self):
-        if self.refeicao in ["cafe_da_manha", "lanche_tarde"]:
-            #if self.refeicao == "lanche_tarde" and self.objetivo == "perder":
-            #     df = pd.read_csv("lanche_ceia.csv")
-            # else:
-            df = pd.read_csv("cafe_da_manha.csv")
-        elif self.refeicao in ["almoco", "jantar"]:
-            df = pd.read_csv("almoco_jantar.csv")
-        elif self.refeicao in ["lanche_manha", "ceia"]:
-            df = pd.read_csv("lanche_ceia.csv")
-        else:
-            raise ValueError(f"Refeição '{self.refeicao}' não reconhecida")
+        #if self.refeicao == "lanche_tarde" and self.objetivo == "perder":
+        #     path = "lanche_ceia.csv"
+        path = FoodCatalog.meal_file(self.refeicao)
 
-        df = HealthUtils.aplicar_restricao(df.copy(), self.restricao) if self.restricao else df.copy()
+        df = FoodCatalog.restricted(path, self.restricao)
         if df.empty:
             raise ValueError(f"Nenhum alimento disponível para '{self.refeicao}' com a restrição '{self.restricao}'")
         return df
 
+    def _build_nutrient_matrix(self):
+        """Pré-calcula a matriz de nutrientes (linha = posição do alimento em self.foods).
+
+        A última linha é uma sentinela zerada, usada para completar indivíduos
+        com menos alimentos que o blueprint. Valores ausentes viram 0, como o
+        `sum()` do pandas fazia ao ignorar NaN.
+        """
+        self._has_carbs = "carbs_g" in self.foods.columns
+        n = len(self.foods)
+        matrix = np.zeros((n + 1, len(self.NUTRIENT_COLUMNS)))
+        for j, col in enumerate(self.NUTRIENT_COLUMNS):
+            if col in self.foods.columns:
+                matrix[:n, j] = pd.to_numeric(self.foods[col], errors="coerce").fillna(0).to_numpy(dtype=float)
+        self._nutrients = matrix
+
+        codes, self._categories = pd.factorize(self.foods["category"])
+        self._category_codes = np.append(codes, -1)
+        self._ids = self.foods["id"].to_numpy()
+        self._sentinel = n
+
+    def _build_category_index(self):
+        """Mapeia cada categoria para o array de posições de seus alimentos em self.foods."""
+        self._category_index = {
+            cat: np.flatnonzero(self._category_codes == code)
+            for code, cat in enumerate(self._categories)
+        }
+
+    def _build_slot_tables(self):
+        """Monta, para cada slot do blueprint, a tabela de alimentos sorteáveis.
+
+        Cada slot vira um par (tabela, tamanhos): uma linha por categoria
+        alternativa com alimentos disponíveis, completada com -1. Slots sem
+        nenhum alimento disponível são descartados, como o `_create_individual`
+        faz ao pular categorias vazias.
+        """
+        self._slot_tables = []
+        for cat in self.required_cats:
+            alternatives = cat if isinstance(cat, list) else [cat]
+            candidates = [self._category_index[c] for c in alternatives if c in self._category_index]
+            if not candidates:
+                continue
+            table = np.full((len(candidates), max(len(c) for c in candidates)), -1)
+            for i, c in enumerate(candidates):
+                table[i, :len(c)] = c
+            self._slot_tables.append((table, np.array([len(c) for c in candidates])))
+
     def _get_required_categories(self):
         if self.refeicao == "cafe_da_manha":
             cats = GeneticMealPlanner.BLUEPRINT["cafe_da_manha"].copy()
@@ -72,54 +194,102 @@ class GeneticMealPlanner:
         else:
             cats = []
 
+        restricoes = HealthUtils.separar_restricoes(self.restricao)
+
         # Restrição para intolerantes à lactose
-        if self.restricao == "lactointolerante" and "leite_e_derivados" in cats:
+        if "lactointolerante" in restricoes and "leite_e_derivados" in cats:
             cats.remove("leite_e_derivados")
             cats.extend(["frutas_e_derivados", "ovos_e_derivados"])
         
-        if self.refeicao == "cafe_da_manha" and self.restricao == "gluten":
+        if self.refeicao == "cafe_da_manha" and "gluten" in restricoes:
             cats = ["leite_e_derivados" if c == "cereais_e_derivados" else c for c in cats]
 
         return cats
 
+    def _random_food(self, cat):
+        """Sorteia o id de um alimento da categoria (ou de uma das alternativas).
+
+        Retorna None quando a categoria sorteada não tem alimentos disponíveis.
+        """
+        if isinstance(cat, list):
+            cat = cat[self.rng.integers(len(cat))]
+        candidates = self._category_index.get(cat)
+        if candidates is None:
+            return None
+        return self._ids[candidates[self.rng.integers(len(candidates))]]
+
     def _create_individual(self): 
         chosen = []
         for cat in self.required_cats:
-            if isinstance(cat, list):
-                selected_cat = random.choice(cat) 
-            else:
-                selected_cat = cat 
-        
-            candidates = self.foods[self.foods["category"] == selected_cat]
-            if not candidates.empty:
-                chosen.append(candidates.sample(1)["id"].iloc[0])
+            food = self._random_food(cat)
+            if food is not None:
+                chosen.append(food)
         return chosen
     # =============================
     # Operadores Genéticos
     # =============================
+    def _positions(self, ind):
+        """Posições em self.foods dos alimentos do indivíduo (mesma semântica do `isin`)."""
+        positions = np.flatnonzero(np.isin(self._ids, list(ind)))
+        if positions.size == 0:
+            positions = np.array([self._sentinel])
+        return positions
+
     def _fitness(self, ind):
-        subset = self.foods[self.foods["id"].isin(ind)]
-        
-        kcal = subset["kcal"].sum()
-        protein = subset["protein_g"].sum()
-        fat = subset["fat_g"].sum()
-        fibers = subset["fiber_g"].fillna(0).sum()
-        iron = subset["iron_mg"].fillna(0).sum()
-        sodium = subset["sodium_mg"].fillna(0).sum()
+        if not self.cache_size:
+            return self._compute_fitness(ind)
+
+        # O fitness só depende do conjunto de alimentos, então a chave é canônica
+        key = tuple(sorted(set(ind)))
+        cached = self._fitness_cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            self._fitness_cache.move_to_end(key)
+            return cached
+
+        self.cache_misses += 1
+        value = self._compute_fitness(ind)
+        self._fitness_cache[key] = value
+        if len(self._fitness_cache) > self.cache_size:
+            self._fitness_cache.popitem(last=False)
+        return value
+
+    def _compute_fitness(self, ind):
+        return float(self._score_positions(self._positions(ind)[np.newaxis, :])[0])
+
+    def _score_positions(self, positions):
+        """Calcula o fitness de vários indivíduos de uma vez.
+
+        `positions` é uma matriz (n_individuos, n_slots) de posições em
+        self.foods. Alimentos repetidos no mesmo indivíduo contam uma única vez.
+        """
+        self.evaluations += len(positions)
+        positions = np.sort(positions, axis=1)
+        codes = self._category_codes[positions]
+
+        totals = self._nutrients[positions[:, 0]].copy()
+        variety = (codes[:, 0] >= 0).astype(int)
+        for j in range(1, positions.shape[1]):
+            repeated = positions[:, j] == positions[:, j - 1]
+            totals += np.where(repeated[:, np.newaxis], 0.0, self._nutrients[positions[:, j]])
+            new_cat = (codes[:, j] >= 0) & (codes[:, :j] != codes[:, j:j + 1]).all(axis=1)
+            variety += new_cat
+
+        return self._score_totals(totals, variety)
+
+    def _score_totals(self, totals, variety):
+        kcal, protein, fat, fibers, iron, sodium, carbs = totals.T
 
         # Usa carb_g se estiver disponível, senão estima
-        if "carbs_g" in subset.columns:
-            carbs = subset["carbs_g"].sum()
-        else:
-            carbs = (kcal - (protein * 4 + fat * 9)) / 4
-            carbs = max(0, carbs)  # evita valores negativos
+        if not self._has_carbs:
+            carbs = np.maximum(0, (kcal - (protein * 4 + fat * 9)) / 4)  # evita valores negativos
 
         # Diferenças absolutas
-        diff_kcal = abs(self.target_kcal - kcal)
-        diff_protein = abs((self.target_protein_g or 0) - protein)
-        diff_fat = abs((self.target_fat_g or 0) - fat)
-        diff_fibers = abs((self.target_fibers_g or 0) - fibers)
-        diff_carbs = abs((self.target_carbs_g or 0) - carbs)
+        diff_kcal = np.abs(self.target_kcal - kcal)
+        diff_protein = np.abs((self.target_protein_g or 0) - protein)
+        diff_fat = np.abs((self.target_fat_g or 0) - fat)
+        diff_fibers = np.abs((self.target_fibers_g or 0) - fibers)
+        diff_carbs = np.abs((self.target_carbs_g or 0) - carbs)
 
         # Penalidade inicial com pesos ajustados
         penalty = (
@@ -130,10 +300,10 @@ class GeneticMealPlanner:
             diff_fibers * 5
         )
 
-        if self.target_protein_g and protein < self.target_protein_g:
-            penalty += (self.target_protein_g - protein) * 8
-        if self.target_fibers_g and fibers < self.target_fibers_g:
-            penalty += (self.target_fibers_g - fibers) * 6
+        if self.target_protein_g:
+            penalty = penalty + np.where(protein < self.target_protein_g, (self.target_protein_g - protein) * 8, 0.0)
+        if self.target_fibers_g:
+            penalty = penalty + np.where(fibers < self.target_fibers_g, (self.target_fibers_g - fibers) * 6, 0.0)
 
         if self.nivel_triglicerideos in ['moderado', 'alto']:
             penalty += fat * 0.4
@@ -142,19 +312,18 @@ class GeneticMealPlanner:
         if self.nivel_ferro == 'baixa':
             penalty -= iron * 1.0  
 
-      
         penalty += sodium / 100
 
-        if kcal > self.target_kcal * 1.15:
-            return -float("inf")  # indivíduo é descartado
-
-        # Bonificação por variedade de categorias
-        variety = subset["category"].nunique()
-        return -penalty + variety * 5
+        # Bonificação por variedade de categorias; acima de 15% da meta o indivíduo é descartado
+        score = -penalty + variety * 5
+        return np.where(kcal > self.target_kcal * 1.15, -np.inf, score)
 
-    def _select(self, population):
-        a, b = random.sample(population, 2)
-        return a if self._fitness(a) > self._fitness(b) else b
+    def _select(self, population, fitness=None):
+        """Torneio binário; `fitness` é a tabela já calculada, alinhada à população."""
+        i, j = self.rng.choice(len(population), 2, replace=False)
+        if fitness is None:
+            fitness = {i: self._fitness(population[i]), j: self._fitness(population[j])}
+        return population[i] if fitness[i] > fitness[j] else population[j]
 
     def _crossover(self, p1, p2):
         child = []
@@ -166,42 +335,183 @@ class GeneticMealPlanner:
                     chosen = candidate
                     break
             if not chosen:
-                if isinstance(cat, list):
-                    cat = random.choice(cat)
-                candidates = self.foods[self.foods["category"] == cat]
-                if not candidates.empty:
-                    chosen = candidates.sample(1)["id"].iloc[0]
+                chosen = self._random_food(cat)
             if chosen:
                 child.append(chosen)
         return child
 
     def _mutate(self, ind):
-        if random.random() < 0.2:
-            idx = random.randrange(len(ind))
-            cat = self.required_cats[idx]
-            if isinstance(cat, list):
-                cat = random.choice(cat)
-            candidates = self.foods[self.foods["category"] == cat]
-            if not candidates.empty:
-                ind[idx] = candidates.sample(1)["id"].iloc[0]
+        if self.rng.random() < self.MUTATION_RATE:
+            idx = self.rng.integers(len(ind))
+            food = self._random_food(self.required_cats[idx])
+            if food is not None:
+                ind[idx] = food
         return ind
 
+    # =============================
+    # Operadores Genéticos vetorizados
+    # =============================
+    def _draw_slot(self, slot, n):
+        """Sorteia `n` alimentos (posições) para o slot: categoria e depois alimento."""
+        table, lengths = self._slot_tables[slot]
+        alt = self.rng.integers(len(lengths), size=n)
+        return table[alt, self.rng.integers(lengths[alt])]
+
+    def _create_population(self, pop_size):
+        population = np.empty((pop_size, len(self._slot_tables)), dtype=int)
+        for slot in range(population.shape[1]):
+            population[:, slot] = self._draw_slot(slot, pop_size)
+        return population
+
+    def _select_batch(self, fitness, n):
+        """Torneio binário para `n` vagas, retorna os índices dos vencedores."""
+        a = self.rng.integers(len(fitness), size=n)
+        b = self.rng.integers(len(fitness), size=n)
+        return np.where(fitness[a] > fitness[b], a, b)
+
+    def _crossover_batch(self, p1, p2):
+        """Crossover uniforme por slot entre as matrizes de pais `p1` e `p2`."""
+        return np.where(self.rng.random(p1.shape) < 0.5, p1, p2)
+
+    def _mutate_batch(self, population):
+        """Cada indivíduo sofre, com probabilidade MUTATION_RATE, a troca de um slot."""
+        mutate = self.rng.random(len(population)) < self.MUTATION_RATE
+        slots = self.rng.integers(population.shape[1], size=len(population))
+        for slot in range(population.shape[1]):
+            rows = np.flatnonzero(mutate & (slots == slot))
+            if rows.size:
+                population[rows, slot] = self._draw_slot(slot, rows.size)
+        return population
+
     # =============================
     # Execução do Algoritmo Genético
     # =============================
-    def run(self, pop_size=50, generations=100):
+    def run(self, pop_size=50, generations=100, solver="ga",
+            patience=None, target_fitness=None, tol=0.0, deadline_ms=None, elite=None, history=False):
+        """Roda o `solver` ("ga", "batch", "exhaustive" ou "auto") e retorna as linhas de self.foods da melhor refeição.
+
+        Gerações executadas, motivo da parada e melhor fitness ficam em self.run_info.
+        """
+        start = time.perf_counter()
+        # "auto": enumera quando as combinações cabem em EXHAUSTIVE_THRESHOLD
+        if solver == "auto":
+            solver = "exhaustive" if self._count_combinations() <= self.EXHAUSTIVE_THRESHOLD else "batch"
+        if solver not in ["ga", "batch", "exhaustive"]:
+            raise ValueError(f"Solver '{solver}' não reconhecido")
+        self.run_info = {"solver": solver, "generations": 0, "stop_reason": None}
+
+        stopping = _EarlyStopping(patience, target_fitness, tol, deadline_ms, history)
+        if solver == "exhaustive":
+            foods = self._run_exhaustive()
+            if history:
+                stopping.update(self.run_info["best_fitness"])
+        else:
+            elite = min(self.ELITE_SIZE if elite is None else elite, pop_size)
+            if solver == "batch":
+                foods = self._run_batch(pop_size, generations, stopping, elite)
+            else:
+                foods = self._run_ga(pop_size, generations, stopping, elite)
+
+        if history:
+            self.run_info["history"] = stopping.history
+        self.timings["run"] = time.perf_counter() - start
+        return foods
+
+    def _finish(self, generation, reason, best_fitness):
+        self.run_info.update(generations=generation, stop_reason=reason, best_fitness=float(best_fitness))
+
+    def _run_ga(self, pop_size, generations, stopping, elite):
+        """AG clássico, indivíduo a indivíduo; os `elite` melhores passam intactos a cada geração."""
         population = [self._create_individual() for _ in range(pop_size)]
+        fitness = [self._fitness(ind) for ind in population]
 
-        for _ in range(generations):
-            new_pop = []
-            for _ in range(pop_size):
-                p1 = self._select(population)
-                p2 = self._select(population)
+        generation, reason = 0, "generations"
+        while generation < generations:
+            ranking = sorted(range(len(population)), key=fitness.__getitem__, reverse=True)[:elite]
+            new_pop = [population[i] for i in ranking]
+            new_fitness = [fitness[i] for i in ranking]
+            while len(new_pop) < pop_size:
+                p1 = self._select(population, fitness)
+                p2 = self._select(population, fitness)
                 child = self._crossover(p1, p2)
                 child = self._mutate(child)
                 new_pop.append(child)
-            population = new_pop
+                new_fitness.append(self._fitness(child))
+            population, fitness = new_pop, new_fitness
+            generation += 1
+
+            stop = stopping.update(max(fitness))
+            if stop:
+                reason = stop
+                break
+
+        best = int(np.argmax(fitness))
+        self._finish(generation, reason, fitness[best])
+        return self.foods[self.foods["id"].isin(population[best])]
+
+    def _run_batch(self, pop_size, generations, stopping, elite):
+        """AG com a população como matriz (pop_size, n_slots) de posições e operadores vetorizados.
+
+        Com elitismo como em _run_ga; o fitness de cada indivíduo é calculado uma
+        única vez, quando ele é criado, e fica em uma tabela alinhada à população.
+        """
+        if not self._slot_tables:
+            self._finish(0, "empty", -np.inf)
+            return self.foods.iloc[[]]
+
+        population = self._create_population(pop_size)
+        fitness = self._score_positions(population)
+
+        generation, reason = 0, "generations"
+        while generation < generations:
+            elites = np.argsort(-fitness, kind="stable")[:elite]
+            n_children = pop_size - len(elites)
+            p1 = population[self._select_batch(fitness, n_children)]
+            p2 = population[self._select_batch(fitness, n_children)]
+            children = self._mutate_batch(self._crossover_batch(p1, p2))
+            population = np.vstack([population[elites], children])
+            fitness = np.concatenate([fitness[elites], self._score_positions(children)])
+            generation += 1
+
+            stop = stopping.update(fitness.max())
+            if stop:
+                reason = stop
+                break
+
+        best = np.argmax(fitness)
+        self._finish(generation, reason, fitness[best])
+        return self.foods.iloc[np.unique(population[best])]
+
+    # =============================
+    # Enumeração exaustiva
+    # =============================
+    def _slot_options(self):
+        """Posições sorteáveis de cada slot, juntando as categorias alternativas."""
+        return [table[table >= 0] for table, _ in self._slot_tables]
+
+    def _count_combinations(self):
+        if not self._slot_tables:
+            return 0
+        return int(np.prod([len(options) for options in self._slot_options()]))
+
+    def _run_exhaustive(self):
+        """Pontua todas as combinações do blueprint, em blocos de EXHAUSTIVE_CHUNK; garante a ótima."""
+        if not self._slot_tables:
+            self._finish(0, "empty", -np.inf)
+            return self.foods.iloc[[]]
+
+        options = self._slot_options()
+        shape = [len(o) for o in options]
+        total = int(np.prod(shape))
 
-        best = max(population, key=lambda ind: self._fitness(ind))
-        return self.foods[self.foods["id"].isin(best)]
+        best, best_score = None, -np.inf
+        for start in range(0, total, self.EXHAUSTIVE_CHUNK):
+            idx = np.unravel_index(np.arange(start, min(start + self.EXHAUSTIVE_CHUNK, total)), shape)
+            combos = np.column_stack([o[i] for o, i in zip(options, idx)])
+            scores = self._score_positions(combos)
+            i = np.argmax(scores)
+            if best is None or scores[i] > best_score:
+                best, best_score = combos[i], scores[i]
 
+        self._finish(0, "exhaustive", best_score)
+        return self.foods.iloc[np.unique(best)]
@@ -1,15 +1,61 @@
 import unicodedata
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 
 
 class HealthUtils:
     """Classe utilitária para cálculos e avaliações de saúde."""
 
+    # Restrições conhecidas; a posição de cada uma é o seu bit nas máscaras de alimentos
+    RESTRICOES = [
+        "lactointolerante", "gluten", "frutos_do_mar", "alergia_amendoim",
+        "vegano", "vegetariano", "hipertensao"
+    ]
+
+    # Valores canônicos dos campos categóricos, na ordem usada pelos Categorical
+    CATEGORIAS = {
+        "sexo": ["masculino", "feminino"],
+        "nivel_atividade": ["sedentario", "leve", "moderado", "intenso"],
+        "objetivo": ["perder", "manter", "ganhar"],
+    }
+
+    # Colunas sem as quais não dá para montar um Paciente
+    COLUNAS_PACIENTE = ["nome", "sexo", "idade", "peso_kg", "altura_cm", "nivel_atividade"]
+
+    # dtypes compactos do carregador em blocos (colunas ausentes no CSV são ignoradas)
+    DTYPES_PACIENTE = {
+        "sexo": "category", "nivel_atividade": "category", "objetivo": "category", "restricoes": "category",
+        "glicemia": "float32", "tg": "float32", "hdl": "float32", "ldl": "float32",
+        "ferritina": "float32", "hemoglobina": "float32",
+    }
+
     @staticmethod
+    @lru_cache(maxsize=4096)
     def normalizar_texto(texto):
         nfkd = unicodedata.normalize("NFKD", texto)
         return ''.join(c for c in nfkd if not unicodedata.combining(c)).lower().strip()
 
+    @staticmethod
+    def normalizar_serie(serie, campo=None):
+        """Versão de normalizar_texto para Series: normaliza só os valores distintos.
+
+        Retorna uma Series categórica. Com `campo` (ver CATEGORIAS), as categorias
+        começam pelos valores canônicos do campo; valores fora dele são mantidos
+        normalizados no fim da lista.
+        """
+        serie = pd.Series(serie)
+        original = serie.astype("category")
+        normalizadas = [HealthUtils.normalizar_texto(c) for c in original.cat.categories]
+
+        canonicas = HealthUtils.CATEGORIAS.get(campo, [])
+        categorias = canonicas + sorted(set(normalizadas) - set(canonicas))
+        posicao = {c: i for i, c in enumerate(categorias)}
+        remapeia = np.array([posicao[c] for c in normalizadas] + [-1], dtype=int)
+
+        codigos = remapeia[original.cat.codes.to_numpy()]  # código -1 (NaN) aponta para o último item
+        return pd.Series(pd.Categorical.from_codes(codigos, categorias), index=serie.index, name=serie.name)
+
     @staticmethod
     def calcular_imc(peso, altura):
         if altura <= 0:
@@ -142,24 +188,211 @@ class HealthUtils:
         return dados_refs
 
     @staticmethod
-    def aplicar_restricao(df, restricao):
-        restricao = restricao.lower()
+    def separar_restricoes(restricao):
+        """Converte uma ou mais restrições ("vegano,gluten") em uma lista normalizada."""
+        if not restricao:
+            return []
+        return [HealthUtils.normalizar_texto(r) for r in str(restricao).split(",") if r.strip()]
+
+    @staticmethod
+    def mascara_restricao(df, restricao):
+        """Máscara booleana dos alimentos permitidos para uma única restrição."""
         if restricao == "lactointolerante":
-            return df[(df["contains_lactose"] == False) & (df["contains_milk"] == False)]
+            return (df["contains_lactose"] == False) & (df["contains_milk"] == False)
         elif restricao == "gluten":
-            return df[df["contains_gluten"] == False]
+            return df["contains_gluten"] == False
         elif restricao == "frutos_do_mar":
-            return df[df["contains_shellfish"] == False]
+            return df["contains_shellfish"] == False
         elif restricao == "alergia_amendoim":
-            return df[df["contains_peanut"] == False]
+            return df["contains_peanut"] == False
         elif restricao == "vegano":
-            return df[df["vegan"] == True]
+            return df["vegan"] == True
         elif restricao == "vegetariano":
-            return df[df["vegetarian"] == True]
+            return df["vegetarian"] == True
         elif restricao == "hipertensao":
-            return df[df["sodium_mg"].fillna(0) < 400]
-        return df
+            return df["sodium_mg"].fillna(0) < 400
+        return pd.Series(True, index=df.index)
+
+    @staticmethod
+    def aplicar_restricao(df, restricao):
+        mascara = pd.Series(True, index=df.index)
+        for r in HealthUtils.separar_restricoes(restricao):
+            try:
+                mascara &= HealthUtils.mascara_restricao(df, r)
+            except KeyError:
+                return df.iloc[0:0]  # sem a coluna, nenhum alimento é seguro (como em bits_alimentos)
+        return df[mascara]
+
+    @staticmethod
+    def bits_alimentos(df):
+        """Um inteiro por alimento com o bit de cada restrição conhecida que ele viola.
+
+        Restrições cujas colunas não existem no DataFrame marcam todos os
+        alimentos: sem a informação, nenhum deles é seguro para quem tem a restrição.
+        """
+        bits = np.zeros(len(df), dtype=np.int64)
+        for i, restricao in enumerate(HealthUtils.RESTRICOES):
+            try:
+                proibido = ~HealthUtils.mascara_restricao(df, restricao).to_numpy(dtype=bool)
+            except KeyError:
+                proibido = np.ones(len(df), dtype=bool)
+            bits |= proibido.astype(np.int64) << i
+        return bits
+
+    @staticmethod
+    def bits_restricao(restricao):
+        """Máscara de bits de uma combinação de restrições; desconhecidas são ignoradas."""
+        bits = 0
+        for r in HealthUtils.separar_restricoes(restricao):
+            if r in HealthUtils.RESTRICOES:
+                bits |= 1 << HealthUtils.RESTRICOES.index(r)
+        return bits
 
     @staticmethod
     def load_patient_data(file_path):
         return pd.read_csv(file_path)
+
+    @staticmethod
+    def carregar_pacientes_em_blocos(file_path, chunksize=10_000):
+        """Lê o CSV de pacientes em blocos de `chunksize` linhas, com dtypes compactos.
+
+        As colunas obrigatórias são conferidas pelo cabeçalho antes de ler os
+        dados (ValueError se faltar alguma). O índice de cada bloco continua
+        sendo o número da linha no arquivo.
+        """
+        cabecalho = pd.read_csv(file_path, nrows=0).columns
+        faltando = [c for c in HealthUtils.COLUNAS_PACIENTE if c not in cabecalho]
+        if faltando:
+            raise ValueError(f"Colunas obrigatórias ausentes em {file_path}: {', '.join(faltando)}")
+
+        dtypes = {c: t for c, t in HealthUtils.DTYPES_PACIENTE.items() if c in cabecalho}
+        yield from pd.read_csv(file_path, dtype=dtypes, chunksize=chunksize)
+
+    @staticmethod
+    def carregar_pacientes(file_path, chunksize=10_000):
+        """Gera (número da linha, Paciente) sob demanda, um bloco do CSV por vez."""
+        from Paciente import Paciente  # import local: Paciente depende de HealthUtils
+
+        for bloco in HealthUtils.carregar_pacientes_em_blocos(file_path, chunksize):
+            yield from zip(bloco.index, Paciente.from_frame(bloco))
+
+    # =============================
+    # Versões vetorizadas (coorte inteira)
+    # =============================
+    @staticmethod
+    def calcular_imc_vetorizado(peso, altura):
+        """Mesmo resultado de calcular_imc para arrays; altura inválida gera IMC NaN."""
+        peso = np.asarray(peso, dtype=float)
+        altura = np.asarray(altura, dtype=float)
+        # como em calcular_imc, só altura <= 0 é inválida; altura NaN dá IMC NaN e "obesidade grau 3"
+        valida = ~(altura <= 0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            imc = np.where(valida, peso / ((altura / 100) ** 2), np.nan)
+        classificacao = np.select(
+            [~valida, imc < 18.5, imc < 25, imc < 30, imc < 35, imc < 40],
+            ["Altura inválida.", "abaixo do peso", "peso normal", "sobrepeso", "obesidade grau 1", "obesidade grau 2"],
+            default="obesidade grau 3"
+        )
+        return np.round(imc, 2), classificacao
+
+    @staticmethod
+    def calcular_tbm_tdee_vetorizado(sexo, idade, peso, altura, nivel_atividade, objetivo):
+        """Mesmo resultado de calcular_tbm_tdee_calorias; nível de atividade desconhecido gera NaN."""
+        sexo = HealthUtils.normalizar_serie(sexo, "sexo").to_numpy()
+        objetivo = HealthUtils.normalizar_serie(objetivo, "objetivo").to_numpy()
+        nivel_atividade = HealthUtils.normalizar_serie(nivel_atividade, "nivel_atividade").to_numpy()
+        idade = np.asarray(idade, dtype=float)
+        peso = np.asarray(peso, dtype=float)
+        altura = np.asarray(altura, dtype=float)
+
+        tmb = np.where(
+            sexo == "masculino",
+            10 * peso + 6.25 * altura - 5 * idade + 5,
+            10 * peso + 6.25 * altura - 5 * idade - 161
+        )
+        fatores = {"sedentario": 1.2, "leve": 1.375, "moderado": 1.55, "intenso": 1.725}
+        tdee = tmb * pd.Series(nivel_atividade).map(fatores).to_numpy(dtype=float)
+
+        perder = objetivo == "perder"
+        ganhar = objetivo == "ganhar"
+        ajustado = perder | ganhar
+        tdee_final = np.select([perder, ganhar], [tdee * 0.85, tdee * 1.10], default=np.round(tdee, 2))
+        tmb_final = np.where(ajustado, tmb, np.round(tmb, 2))
+        return tmb_final, tdee_final
+
+    @staticmethod
+    def metas_macros_vetorizado(tmb, tdee, peso, objetivo, glicemia=None, tg=None):
+        """Mesmo resultado de metas_macros para arrays (objetivo comparado sem normalizar)."""
+        tmb = np.asarray(tmb, dtype=float)
+        tdee = np.asarray(tdee, dtype=float)
+        peso = np.asarray(peso, dtype=float)
+        objetivo = np.asarray(objetivo, dtype=object)
+        glicemia = np.full(len(tdee), np.nan) if glicemia is None else np.asarray(glicemia, dtype=float)
+        tg = np.full(len(tdee), np.nan) if tg is None else np.asarray(tg, dtype=float)
+
+        glicemia_alta = glicemia >= 100
+        proteina_g = np.select([objetivo == "perder", objetivo == "ganhar"], [peso * 1.5, peso * 1.7], default=peso * 1.2)
+        proteina_g = np.where(glicemia_alta, np.maximum(proteina_g, peso * 1.5), proteina_g)
+
+        gordura_kcal = tdee * 0.30
+        gordura_g = gordura_kcal / 9
+        fibras_g = (tdee/1000) * 14
+
+        restante_kcal = tdee - (proteina_g * 4 + gordura_g * 9 + fibras_g * 2)
+        carboidratos_g = restante_kcal / 4
+        carboidratos_g = np.where(glicemia_alta, (tdee * 0.4) / 4, carboidratos_g)
+        carboidratos_g = np.where(tg >= 200, (tdee * 0.35) / 4, carboidratos_g)
+
+        return pd.DataFrame({
+            'tmb': np.rint(tmb),
+            'total_kcal': np.rint(tdee),
+            'proteina_g': np.rint(proteina_g),
+            'gordura_g': np.rint(gordura_g),
+            'carboidratos_g': np.rint(carboidratos_g),
+            'fibras_g': np.rint(fibras_g)
+        })
+
+    @staticmethod
+    def avaliar_exames_vetorizado(glicemia, tg, ldl, hdl, ferritina, hemoglobina):
+        """Níveis de exames para arrays, com as mesmas faixas das funções avaliar_*."""
+        glicemia, tg, ldl, hdl, ferritina, hemoglobina = (
+            np.asarray(v, dtype=float) for v in (glicemia, tg, ldl, hdl, ferritina, hemoglobina)
+        )
+        return pd.DataFrame({
+            "nivel_glicemia": np.select([glicemia < 100, glicemia <= 125], ["normal", "pre_diabetes"], default="diabetes"),
+            "nivel_triglicerideos": np.select([tg >= 200, tg >= 150], ["alto", "moderado"], default="normal"),
+            "nivel_ldl": np.select([ldl < 100, ldl < 160], ["normal", "moderado"], default="critico"),
+            "nivel_hdl": np.select([hdl < 40, hdl <= 60], ["ruim", "moderado"], default="bom"),
+            "nivel_ferro": np.where((ferritina < 30) | (hemoglobina < 12), "baixa", "normal"),
+        })
+
+    @staticmethod
+    def calcular_metricas_coorte(df):
+        """IMC, TMB/TDEE, metas de macros e níveis de exames de uma tabela de pacientes.
+
+        Espera as colunas de pacientes_ro.csv (peso_kg, altura_cm, sexo, idade,
+        nivel_atividade, objetivo e exames). As metas de macros usam o TDEE
+        arredondado para 2 casas, como o MealPlanGenerator.
+
+        Os resultados são idênticos aos das funções escalares aplicadas linha a
+        linha (Paciente.from_dataframe), que recebem escalares NumPy e portanto
+        também arredondam com a semântica do np.round. A exceção é a altura
+        NaN: o metas_macros escalar estoura ao arredondar a TMB, e aqui as metas
+        dessa linha saem NaN.
+        """
+        imc, imc_class = HealthUtils.calcular_imc_vetorizado(df["peso_kg"], df["altura_cm"])
+        tmb, tdee = HealthUtils.calcular_tbm_tdee_vetorizado(
+            df["sexo"], df["idade"], df["peso_kg"], df["altura_cm"], df["nivel_atividade"], df["objetivo"]
+        )
+        macros = HealthUtils.metas_macros_vetorizado(
+            tmb, np.round(tdee, 2), df["peso_kg"], df["objetivo"], df["glicemia"], df["tg"]
+        )
+        exames = HealthUtils.avaliar_exames_vetorizado(
+            df["glicemia"], df["tg"], df["ldl"], df["hdl"], df["ferritina"], df["hemoglobina"]
+        )
+
+        resultado = pd.concat([pd.DataFrame({"imc": imc, "imc_class": imc_class, "tmb": tmb, "tdee": tdee}),
+                               macros.drop(columns="tmb"), exames], axis=1)
+        resultado.index = df.index
+        return resultado
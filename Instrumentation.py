@@ -0,0 +1,133 @@
+import json
+import threading
+import time
+from collections import defaultdict
+
+
+class Instrumentation:
+    """Métricas opcionais de desempenho do planejamento, por paciente e refeição.
+
+    Desligada por padrão. Desligada, o único custo são os tempos de fase que o
+    GeneticMealPlanner já guarda em `timings` (alguns perf_counter por planner);
+    o fitness só é cronometrado em planners instrumentados, trocando o
+    `_score_positions` daquela instância. Ligada, cada refeição planejada e
+    cada markdown renderizado viram um registro (dict), exportável como JSON
+    Lines ou como texto no formato de exposição do Prometheus.
+
+    O estado é do processo, como o FoodCatalog; planners rodando em outros
+    processos devolvem suas métricas no run_info e o MealPlanGenerator as
+    registra no processo principal.
+    """
+
+    ativo = False
+    _registros = []
+    _lock = threading.Lock()
+
+    @classmethod
+    def ativar(cls, ativo=True):
+        cls.ativo = ativo
+
+    @classmethod
+    def limpar(cls):
+        with cls._lock:
+            cls._registros = []
+
+    @classmethod
+    def registrar(cls, **registro):
+        with cls._lock:
+            cls._registros.append(registro)
+
+    @classmethod
+    def registros(cls):
+        with cls._lock:
+            return list(cls._registros)
+
+    @classmethod
+    def coletar(cls):
+        """Retorna e descarta os registros (para devolvê-los de um worker ao processo principal)."""
+        with cls._lock:
+            registros, cls._registros = cls._registros, []
+        return registros
+
+    # =============================
+    # Coleta no planner
+    # =============================
+    @staticmethod
+    def cronometrar_fitness(planner):
+        """Acumula em planner.fitness_seconds o tempo gasto pontuando indivíduos."""
+        original = planner._score_positions
+        planner.fitness_seconds = 0.0
+
+        def cronometrado(positions):
+            inicio = time.perf_counter()
+            try:
+                return original(positions)
+            finally:
+                planner.fitness_seconds += time.perf_counter() - inicio
+
+        planner._score_positions = cronometrado
+
+    @staticmethod
+    def metricas_planner(planner):
+        """Tempos de fase e contadores de um planner depois de run()."""
+        return {
+            "solver": planner.run_info.get("solver"),
+            "load_foods_s": planner.timings.get("load_foods"),
+            "build_s": planner.timings.get("build"),
+            "run_s": planner.timings.get("run"),
+            "fitness_s": getattr(planner, "fitness_seconds", None),
+            # indivíduos pontuados, pelo cache ou não (os solvers vetorizados não usam o cache)
+            "fitness_calls": planner.evaluations + planner.cache_hits,
+            "cache_hits": planner.cache_hits,
+            "cache_misses": planner.cache_misses,
+            "avaliacoes": planner.evaluations,
+            "geracoes": planner.run_info.get("generations"),
+            "candidatos": {cat: int(len(idx)) for cat, idx in planner._category_index.items()},
+        }
+
+    # =============================
+    # Exportação
+    # =============================
+    @classmethod
+    def salvar_jsonl(cls, caminho):
+        with open(caminho, "w", encoding="utf-8") as f:
+            for registro in cls.registros():
+                f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+
+    @classmethod
+    def prometheus(cls):
+        """Agrega os registros por refeição no formato texto do Prometheus."""
+        contadores = defaultdict(float)
+        for r in cls.registros():
+            if r.get("fase") == "planejamento":
+                ref = r["refeicao"]
+                contadores[("mealplan_meals_total", (("refeicao", ref),))] += 1
+                for fase in ["load_foods", "build", "run", "fitness"]:
+                    if r.get(f"{fase}_s") is not None:
+                        chave = ("mealplan_phase_seconds_total", (("fase", fase), ("refeicao", ref)))
+                        contadores[chave] += r[f"{fase}_s"]
+                for campo, nome in [("fitness_calls", "mealplan_fitness_calls_total"),
+                                    ("cache_hits", "mealplan_fitness_cache_hits_total"),
+                                    ("avaliacoes", "mealplan_fitness_evaluations_total"),
+                                    ("geracoes", "mealplan_generations_total")]:
+                    contadores[(nome, (("refeicao", ref),))] += r.get(campo) or 0
+                for cat, n in r.get("candidatos", {}).items():
+                    contadores[("mealplan_candidates_total", (("categoria", cat), ("refeicao", ref)))] += n
+            elif r.get("fase") == "render":
+                contadores[("mealplan_phase_seconds_total", (("fase", "render"),))] += r["segundos"]
+                contadores[("mealplan_renders_total", ())] += 1
+
+        linhas = []
+        for nome in sorted({nome for nome, _ in contadores}):
+            linhas.append(f"# TYPE {nome} counter")
+            for (metrica, rotulos), valor in sorted(contadores.items()):
+                if metrica != nome:
+                    continue
+                texto = ",".join(f'{k}="{v}"' for k, v in rotulos)
+                linhas.append(f"{nome}{{{texto}}} {valor!r}" if texto else f"{nome} {valor!r}")
+        return "\n".join(linhas) + "\n"
+
+    @classmethod
+    def salvar_prometheus(cls, caminho):
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write(cls.prometheus())
@@ -1,16 +1,68 @@
 from HealthUtils import HealthUtils
 from Paciente import Paciente
 from GeneticMealPlanner import GeneticMealPlanner
+from FoodCatalog import FoodCatalog
+from Instrumentation import Instrumentation
+from PlanCache import PlanCache
 from dicionario_alimentos import dicionario_alimentos
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import BrokenExecutor, ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-import random
+
+
+def _nativo(valor):
+    """Converte escalares NumPy em tipos Python e NaN em None (para JSON/Parquet)."""
+    if isinstance(valor, np.float32):
+        # exames do carregador compacto: 110.2 e não 110.19999694824219
+        valor = float(str(valor))
+    elif isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and valor != valor:
+        return None
+    return valor
+
+
+def _planejar_refeicao(planner_kwargs, run_kwargs, instrumentar=False):
+    """Executa o GeneticMealPlanner de uma refeição (função de módulo para poder ir a outro processo).
+
+    Com `instrumentar`, o run_info devolvido leva as métricas do planner em "metricas".
+    """
+    planner = GeneticMealPlanner(**planner_kwargs)
+    if instrumentar:
+        Instrumentation.cronometrar_fitness(planner)
+    foods = planner.run(**run_kwargs)
+    if instrumentar:
+        return foods, {**planner.run_info, "metricas": Instrumentation.metricas_planner(planner)}
+    return foods, planner.run_info
+
 
 class MealPlanGenerator:
 
-    def __init__(self, paciente: Paciente, saladas_csv="saladas.csv"):
+    REFEICOES = ["cafe_da_manha", "lanche_manha", "almoco", "lanche_tarde", "jantar", "ceia"]
+
+    # Pools de executor="thread"/"process", criados no primeiro uso e compartilhados
+    # entre instâncias, para não pagar a criação dos workers a cada cardápio
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, paciente: Paciente, saladas_csv="saladas.csv", seed=None, plan_cache=None,
+                 run_kwargs=None, executor=None):
         self.paciente = paciente
         self.refeicoes_dict = {}
-        self.saladas_df = pd.read_csv(saladas_csv)
+        self.seed = seed
+        self.plan_cache = plan_cache
+        # Repassados a GeneticMealPlanner.run (solver, pop_size, patience, deadline_ms...)
+        self.run_kwargs = run_kwargs or {}
+        # Planejamento das refeições em paralelo: None (em série), "thread", "process" (pools compartilhados)
+        # ou uma instância de concurrent.futures.Executor reaproveitada entre pacientes
+        self.executor = executor
+        self.saladas_df = FoodCatalog.load(saladas_csv)
 
         self.imc, self.classificacao_imc = paciente.calcular_imc()
         self.tmb, self.tdee = HealthUtils.calcular_tbm_tdee_calorias(
@@ -24,134 +76,315 @@ class MealPlanGenerator:
             paciente.altura, paciente.nivel_atividade, paciente.objetivo,
             paciente.glicemia, paciente.tg
         )
+        self._perfil = None
+
+    def _semente(self, *partes):
+        """Deriva uma seed independente e determinística para um fluxo aleatório.
+
+        As `partes` identificam o fluxo (refeição e suas entradas efetivas), de
+        modo que a mesma seed base com as mesmas entradas sempre sorteia o mesmo
+        cardápio. Sem seed base o resultado não é reprodutível (retorna None).
+        """
+        if self.seed is None:
+            return None
+        chave = json.dumps([self.seed, *partes], sort_keys=True, default=str)
+        return int.from_bytes(hashlib.sha256(chave.encode("utf-8")).digest()[:8], "big")
+
+    def _chave_cache(self, ref, meta_ref, exames, variante=0):
+        """Chave do PlanCache: tudo que determina a refeição gerada pelo planner."""
+        return PlanCache.chave(
+            refeicao=ref,
+            restricao=sorted(HealthUtils.separar_restricoes(self.paciente.restricoes)),
+            metas=[round(meta_ref[k], 1) for k in ["Kcal", "Proteina", "Carbo", "Gordura", "Fibra"]],
+            exames=[exames["triglicerideos"], exames["colesterol"]["hdl"], exames["colesterol"]["ldl"], exames["ferro"]],
+            catalogo=FoodCatalog.version(FoodCatalog.meal_file(ref)),
+            seed=self.seed,
+            run_kwargs=self.run_kwargs,
+            variante=variante,
+        )
+
+    NOMES_REFEICOES = {
+        "cafe_da_manha": "🥐 Café da Manhã",
+        "lanche_manha": "🍎 Lanche da Manhã",
+        "almoco": "🍽️ Almoço",
+        "lanche_tarde": "☕ Lanche da Tarde",
+        "jantar": "🍲 Jantar",
+        "ceia": "🥛 Ceia"
+    }
 
     def _formatar_refeicoes(self):
-        nomes_refeicoes = {
-            "cafe_da_manha": "🥐 Café da Manhã",
-            "lanche_manha": "🍎 Lanche da Manhã",
-            "almoco": "🍽️ Almoço",
-            "lanche_tarde": "☕ Lanche da Tarde",
-            "jantar": "🍲 Jantar",
-            "ceia": "🥛 Ceia"
-        }
-        
-        refeicoes_formatadas = ""
-        
+        buffer = io.StringIO()
+        self._escrever_refeicoes(buffer)
+        return buffer.getvalue()
+
+    def _escrever_refeicoes(self, out):
+        """Escreve as tabelas das refeições em `out`, uma refeição por vez."""
         for refeicao, dados in self.refeicoes_dict.items():
-            meta = dados["meta"]
-            df = dados["foods"]
-            titulo = nomes_refeicoes.get(refeicao, refeicao.title())
-            
-            refeicoes_formatadas += f"\n## {titulo}\n"
-            # refeicoes_formatadas += (
-            #     f"- Meta: {meta['Kcal']} kcal | {meta['Proteina']}g proteína | "
-            #     f"{meta['Gordura']}g gordura | {meta['Carbo']}g carboidrato | {meta['Fibra']}g fibras\n\n"
-            # )
-            
-            refeicoes_formatadas += "| Alimento | Calorias | Proteínas | Gorduras | Carboidratos | Fibras |\n"
-            refeicoes_formatadas += "|----------|----------|-----------|----------|---------------|--------|\n"
-            
-            total_kcal = total_proteina = total_gordura = total_carbo = total_fibra = 0
-
-            for _, row in df.iterrows():
-                kcal = row['kcal']
-                protein = row['protein_g']
-                fat = row['fat_g']
-                carbs = round((kcal - (4 * protein) - (9 * fat)) / 4, 1) if kcal and protein and fat else 0
-                fiber = row['fiber_g'] if pd.notna(row['fiber_g']) and row['fiber_g'] != "nang" else 0
-                
-                # Nome bonitinho com dicionário
-                food_id = row['id']
-                food_name = dicionario_alimentos.get(row['food'], row['food']).title()
-
-                # Ajustes específicos
-                if "Pão" in food_name:
-                    food_name += " (2 fatias ~ 60-70g)"
-                if "Ovo" in food_name:
-                    food_name += " (2 ovos médios)"
-
-                refeicoes_formatadas += f"| {food_name} | {kcal} | {protein} | {fat} | {carbs} | {fiber} |\n"
-                
-                total_kcal += kcal
-                total_proteina += protein
-                total_gordura += fat
-                total_carbo += carbs
-                total_fibra += fiber
-
-            # Adicionar queijo nos lanches
-            if refeicao in ["lanche_manha", "lanche_tarde"]:
-                tem_queijo = any("queijo" in row['food'].lower() for _, row in df.iterrows())
-                
-                if ("lactointolerante" not in self.paciente.restricoes) and not tem_queijo:
-                    refeicoes_formatadas += "| Queijo (1 fatia ~30g) | 90 | 6 | 7 | 1 | 0 |\n"
-                    total_kcal += 90
-                    total_proteina += 6
-                    total_gordura += 7
-                    total_carbo += 1
-
-            # Whey na ceia
-            if refeicao == "ceia":
-                if self.paciente.restricoes == "lactointolerante":
-                    refeicoes_formatadas += "| Whey Isolado (1 dose e meia) | 180 | 36 | 1 | 2 | 0 |\n"
-                    total_kcal += 180
-                    total_proteina += 36
-                    total_gordura += 1
-                    total_carbo += 2
-                else:
-                    refeicoes_formatadas += "| Whey Protein (1 dose) | 120 | 24 | 1 | 2 | 0 |\n"
-                    total_kcal += 120
-                    total_proteina += 24
-                    total_gordura += 1
-                    total_carbo += 2
-
-            # Totais da refeição
-            refeicoes_formatadas += f"\n**Total Nutricional:** {round(total_kcal,1)} kcal | {round(total_proteina,1)}g proteína | {round(total_gordura,1)}g gordura | {round(total_carbo,1)}g carboidrato | {round(total_fibra,1)}g fibras\n"
-
-            # Saladas no almoço e jantar
-            if refeicao in ["almoco", "jantar"]:
-                saladas = self.saladas_df.sample(3)
-                refeicoes_formatadas += "\n### 🥗 Sugestões de saladas (Podem ser ingeridas na quantidade desejada pelo paciente, aumentando ainda mais a ingestão de fibras):\n"
-                for _, s in saladas.iterrows():
-                    ingredientes = [s[c] for c in s.index if c.startswith("ingrediente") and pd.notna(s[c])]
-                    refeicoes_formatadas += f"- {s['nome_salada']}: " + ", ".join(ingredientes) + "\n"
-        
-        return refeicoes_formatadas
+            out.write(self._formatar_refeicao(refeicao, dados))
 
-    def gerar_cardapio(self):
-        refeicoes = ["cafe_da_manha", "lanche_manha", "almoco", "lanche_tarde", "jantar", "ceia"]
-        exames = self.paciente.avaliar_exames()
+    def _formatar_refeicao(self, refeicao, dados):
+        meta = dados["meta"]
+        titulo = self.NOMES_REFEICOES.get(refeicao, refeicao.title())
+        itens = self._itens_refeicao(refeicao, dados["foods"])
 
-        for ref in refeicoes:
+        partes = [f"\n## {titulo}\n"]
+        # partes.append(
+        #     f"- Meta: {meta['Kcal']} kcal | {meta['Proteina']}g proteína | "
+        #     f"{meta['Gordura']}g gordura | {meta['Carbo']}g carboidrato | {meta['Fibra']}g fibras\n\n"
+        # )
+
+        partes.append("| Alimento | Calorias | Proteínas | Gorduras | Carboidratos | Fibras |\n")
+        partes.append("|----------|----------|-----------|----------|---------------|--------|\n")
+        for _, food_name, kcal, protein, fat, carbs, fiber in itens:
+            partes.append(f"| {food_name} | {kcal} | {protein} | {fat} | {carbs} | {fiber} |\n")
+
+        # Totais da refeição
+        total_kcal, total_proteina, total_gordura, total_carbo, total_fibra = self._totais(itens)
+        partes.append(f"\n**Total Nutricional:** {total_kcal} kcal | {total_proteina}g proteína | {total_gordura}g gordura | {total_carbo}g carboidrato | {total_fibra}g fibras\n")
+
+        # Saladas no almoço e jantar
+        saladas = dados.get("saladas", [])
+        if saladas:
+            partes.append("\n### 🥗 Sugestões de saladas (Podem ser ingeridas na quantidade desejada pelo paciente, aumentando ainda mais a ingestão de fibras):\n")
+            for nome, ingredientes in saladas:
+                partes.append(f"- {nome}: " + ", ".join(ingredientes) + "\n")
+
+        return "".join(partes)
+
+    def _itens_refeicao(self, refeicao, df):
+        """Linhas da tabela de uma refeição: (id, alimento, kcal, proteína, gordura, carbo, fibra).
+
+        Inclui os complementos fixos (queijo nos lanches, whey na ceia), que têm id None.
+        """
+        itens = []
+        tem_queijo = False
+
+        for row in df.itertuples(index=False):
+            kcal = row.kcal
+            protein = row.protein_g
+            fat = row.fat_g
+            carbs = round((kcal - (4 * protein) - (9 * fat)) / 4, 1) if kcal and protein and fat else 0
+            fiber = row.fiber_g if pd.notna(row.fiber_g) and row.fiber_g != "nang" else 0
+            tem_queijo = tem_queijo or "queijo" in row.food.lower()
+
+            # Nome bonitinho com dicionário
+            food_name = dicionario_alimentos.get(row.food, row.food).title()
+
+            # Ajustes específicos
+            if "Pão" in food_name:
+                food_name += " (2 fatias ~ 60-70g)"
+            if "Ovo" in food_name:
+                food_name += " (2 ovos médios)"
+
+            itens.append((row.id, food_name, kcal, protein, fat, carbs, fiber))
+
+        # Adicionar queijo nos lanches
+        if refeicao in ["lanche_manha", "lanche_tarde"]:
+            if ("lactointolerante" not in self.paciente.restricoes) and not tem_queijo:
+                itens.append((None, "Queijo (1 fatia ~30g)", 90, 6, 7, 1, 0))
+
+        # Whey na ceia
+        if refeicao == "ceia":
+            if "lactointolerante" in self.paciente.restricoes:
+                itens.append((None, "Whey Isolado (1 dose e meia)", 180, 36, 1, 2, 0))
+            else:
+                itens.append((None, "Whey Protein (1 dose)", 120, 24, 1, 2, 0))
+
+        return itens
+
+    @staticmethod
+    def _totais(itens):
+        """Soma (kcal, proteína, gordura, carbo, fibra) dos itens, arredondada a 1 casa."""
+        totais = [0, 0, 0, 0, 0]
+        for item in itens:
+            for i, valor in enumerate(item[2:]):
+                totais[i] += valor
+        return [round(t, 1) for t in totais]
+
+    def _saladas(self, refeicao, meta):
+        """Sugestões de salada (nome, ingredientes) para almoço e jantar; vazio nas demais."""
+        if refeicao not in ["almoco", "jantar"]:
+            return []
+        rng = np.random.default_rng(self._semente("saladas", refeicao, meta))
+        saladas = self.saladas_df.sample(3, random_state=rng)
+        colunas = [c for c in saladas.columns if c.startswith("ingrediente")]
+        return [
+            (nome, [i for i in ingredientes if pd.notna(i)])
+            for nome, ingredientes in zip(saladas["nome_salada"], saladas[colunas].itertuples(index=False))
+        ]
+
+    @property
+    def perfil(self):
+        """Metas por refeição, exames e macros do paciente, calculados uma única vez."""
+        if self._perfil is None:
             metas = HealthUtils.divisao_refeicoes(
                 self.paciente.objetivo, self.paciente.glicemia, self.macros,
                 self.tdee, self.paciente.restricoes
             )
-            meta_ref = next((m for m in metas if m["Refeicao"] == ref), None)
-            if not meta_ref:
-                continue
-
-            planner = GeneticMealPlanner(
-                refeicao=ref,
-                restricao=self.paciente.restricoes,
-                target_kcal=meta_ref["Kcal"],
-                target_protein_g=meta_ref["Proteina"],
-                target_carbs_g=meta_ref["Carbo"],
-                target_fat_g=meta_ref["Gordura"],
-                nivel_triglicerideos=exames["triglicerideos"],
-                nivel_hdl=exames["colesterol"]["hdl"],
-                nivel_ldl=exames["colesterol"]["ldl"],
-                nivel_ferro=exames["ferro"],
-                target_fibers_g=meta_ref["Fibra"],
-                objetivo=self.paciente.objetivo
-            )
-            foods = planner.run()
-            self.refeicoes_dict[ref] = {"meta": meta_ref, "foods": foods}
+            self._perfil = {
+                "exames": self.paciente.avaliar_exames(),
+                "macros": self.macros,
+                "metas": {m["Refeicao"]: m for m in metas},
+            }
+        return self._perfil
 
-    def gerar_markdown_final(self):
+    def _preparar_refeicao(self, ref, variante=0):
+        """Resolve a refeição pelo PlanCache ou monta a tarefa do planner.
+
+        Retorna (resultado, tarefa); exatamente um dos dois é None. Sem meta para
+        a refeição, ambos são None.
+        """
+        meta_ref = self.perfil["metas"].get(ref)
+        if not meta_ref:
+            return None, None
+        exames = self.perfil["exames"]
+
+        chave = None
+        if self.plan_cache is not None:
+            chave = self._chave_cache(ref, meta_ref, exames, variante)
+            food_ids = self.plan_cache.get(chave)
+            if food_ids is not None:
+                foods = FoodCatalog.by_ids(FoodCatalog.meal_file(ref), food_ids)
+                return self._montar_refeicao(ref, meta_ref, foods), None
+
+        planner_kwargs = dict(
+            refeicao=ref,
+            restricao=self.paciente.restricoes,
+            target_kcal=meta_ref["Kcal"],
+            target_protein_g=meta_ref["Proteina"],
+            target_carbs_g=meta_ref["Carbo"],
+            target_fat_g=meta_ref["Gordura"],
+            nivel_triglicerideos=exames["triglicerideos"],
+            nivel_hdl=exames["colesterol"]["hdl"],
+            nivel_ldl=exames["colesterol"]["ldl"],
+            nivel_ferro=exames["ferro"],
+            target_fibers_g=meta_ref["Fibra"],
+            objetivo=self.paciente.objetivo,
+            seed=self._semente(ref, meta_ref, exames, variante)
+        )
+        return None, (meta_ref, chave, planner_kwargs)
+
+    def gerar_cardapio(self):
+        resultados, tarefas = self.preparar_refeicoes()
+        resultados.update(self._concluir_tarefas(tarefas))
+        self.definir_refeicoes(resultados)
+
+    # =============================
+    # Etapas do cardápio (para executores externos, como o AsyncMealPlanner)
+    # =============================
+    def preparar_refeicoes(self):
+        """Separa as refeições resolvidas pelo PlanCache das que precisam do planner.
+
+        Retorna (resultados, tarefas), por refeição. Cada tarefa roda como
+        _planejar_refeicao(tarefa[2], self.run_kwargs) em qualquer executor e o
+        resultado volta por concluir_refeicao.
+        """
+        resultados, tarefas = {}, {}
+        for ref in self.REFEICOES:
+            resultado, tarefa = self._preparar_refeicao(ref)
+            if resultado is not None:
+                resultados[ref] = resultado
+            elif tarefa is not None:
+                tarefas[ref] = tarefa
+        return resultados, tarefas
+
+    def definir_refeicoes(self, resultados):
+        """Guarda os resultados em refeicoes_dict na ordem canônica, independente da ordem de conclusão."""
+        for ref in self.REFEICOES:
+            if ref in resultados:
+                self.refeicoes_dict[ref] = resultados[ref]
+
+    def gerar_refeicao(self, ref, variante=1):
+        """Gera outra opção para uma única refeição, reaproveitando o perfil do paciente.
+
+        Cada `variante` deriva uma seed diferente (e uma chave de cache própria).
+        """
+        resultado, tarefa = self._preparar_refeicao(ref, variante)
+        if tarefa is not None:
+            resultado = self._concluir_tarefas({ref: tarefa})[ref]
+        if resultado is not None:
+            self.refeicoes_dict[ref] = resultado
+        return resultado
+
+    def _concluir_tarefas(self, tarefas):
+        return {
+            ref: self.concluir_refeicao(ref, tarefas[ref], foods, run_info)
+            for ref, (foods, run_info) in self._executar_planners(tarefas).items()
+        }
+
+    def concluir_refeicao(self, ref, tarefa, foods, run_info):
+        """Registra métricas e PlanCache do resultado de um planner e monta a refeição."""
+        meta_ref, chave, _ = tarefa
+        metricas = run_info.pop("metricas", None)
+        if metricas is not None:
+            Instrumentation.registrar(fase="planejamento", paciente=self.paciente.nome, refeicao=ref, **metricas)
+        if chave is not None:
+            self.plan_cache.set(chave, foods["id"])
+        return self._montar_refeicao(ref, meta_ref, foods, run_info)
+
+    def _montar_refeicao(self, ref, meta_ref, foods, run_info=None):
+        """Entrada de refeicoes_dict; as saladas são sorteadas aqui, uma vez, para o markdown e o plano."""
+        resultado = {"meta": meta_ref, "foods": foods, "saladas": self._saladas(ref, meta_ref)}
+        if run_info is not None:
+            resultado["run_info"] = run_info
+        return resultado
+
+    def _executar_planners(self, tarefas):
+        """Roda os planners das refeições, em série ou no executor configurado."""
+        instrumentar = Instrumentation.ativo
+        if self.executor is None or len(tarefas) < 2:
+            return {
+                ref: _planejar_refeicao(kwargs, self.run_kwargs, instrumentar)
+                for ref, (_, _, kwargs) in tarefas.items()
+            }
+
+        if self.executor in ("thread", "process"):
+            executor = self._pool(self.executor)
+        else:
+            executor = self.executor  # instância de concurrent.futures.Executor fornecida pelo chamador
+
+        try:
+            futures = {
+                ref: executor.submit(_planejar_refeicao, kwargs, self.run_kwargs, instrumentar)
+                for ref, (_, _, kwargs) in tarefas.items()
+            }
+            return {ref: future.result() for ref, future in futures.items()}
+        except BrokenExecutor:
+            # Um worker morreu: descarta o pool quebrado para o próximo cardápio criar outro
+            with self._pools_lock:
+                if self._pools.get(self.executor) is executor:
+                    del self._pools[self.executor]
+            raise
+
+    @classmethod
+    def _pool(cls, tipo):
+        """Pool compartilhado do tipo "thread" ou "process", criado na primeira chamada."""
+        with cls._pools_lock:
+            if tipo not in cls._pools:
+                if tipo == "thread":
+                    cls._pools[tipo] = ThreadPoolExecutor(max_workers=len(cls.REFEICOES))
+                else:
+                    cls._pools[tipo] = ProcessPoolExecutor(max_workers=min(len(cls.REFEICOES), os.cpu_count() or 1),
+                                                           initializer=FoodCatalog.preload)
+            return cls._pools[tipo]
+
+    @classmethod
+    def encerrar_pools(cls):
+        """Encerra os pools compartilhados (são recriados se voltarem a ser usados)."""
+        with cls._pools_lock:
+            pools, cls._pools = cls._pools, {}
+        for pool in pools.values():
+            pool.shutdown()
+
+    def escrever_markdown(self, out):
+        """Escreve o cardápio completo em um stream de texto (arquivo, stdout, StringIO...).
+
+        As refeições são escritas uma a uma, sem montar o documento inteiro em memória.
+        """
+        inicio = time.perf_counter() if Instrumentation.ativo else None
         agua = round(self.paciente.peso * 35 / 1000, 1)
 
-        refeicoes_formatadas = self._formatar_refeicoes()
-        md = f"""# 🍽️ Cardápio Diário Personalizado
+        out.write(f"""# 🍽️ Cardápio Diário Personalizado
 
         ## 👤 Dados do Paciente
         **- Nome:** {self.paciente.nome}
@@ -172,9 +405,68 @@ class MealPlanGenerator:
         - ☕ UMA xícara de café (sem açúcar) pode ajudar na queima de gordura, mas evite exageros!
 
         ---
-        {refeicoes_formatadas}
+        """)
+        self._escrever_refeicoes(out)
+        out.write("""
+        """)
+        if inicio is not None:
+            Instrumentation.registrar(fase="render", paciente=self.paciente.nome,
+                                      segundos=time.perf_counter() - inicio)
+
+    def gerar_markdown_final(self):
+        buffer = io.StringIO()
+        self.escrever_markdown(buffer)
+        return buffer.getvalue()
+
+    def gerar_plano(self):
+        """Cardápio como dicionário serializável (perfil, metas, ids escolhidos e totais).
+
+        Traz os mesmos números do markdown, prontos para os exportadores de
+        PlanExporter ou para json.dumps, sem precisar reler o texto.
         """
-        return md
+        nutrientes = ["kcal", "proteina_g", "gordura_g", "carboidratos_g", "fibras_g"]
+        paciente = self.paciente
+        plano = {
+            "paciente": {
+                campo: _nativo(getattr(paciente, campo))
+                for campo in ["nome", "sexo", "idade", "peso", "altura", "nivel_atividade", "objetivo",
+                              "restricoes", "glicemia", "tg", "hdl", "ldl", "ferritina", "hemoglobina"]
+            },
+            "metricas": {
+                "imc": _nativo(self.imc),
+                "classificacao_imc": self.classificacao_imc,
+                "tmb": _nativo(self.tmb),
+                "tdee": _nativo(self.tdee),
+                "agua_l": _nativo(round(paciente.peso * 35 / 1000, 1)),
+                # a TMB dos macros é arredondada; vale a de self.tmb, a mesma do markdown
+                **{k: _nativo(v) for k, v in self.macros.items() if k != "tmb"},
+            },
+            "refeicoes": [],
+        }
+
+        for refeicao, dados in self.refeicoes_dict.items():
+            meta = dados["meta"]
+            itens = self._itens_refeicao(refeicao, dados["foods"])
+            plano["refeicoes"].append({
+                "refeicao": refeicao,
+                "meta": {
+                    "kcal": _nativo(meta["Kcal"]),
+                    "proteina_g": _nativo(meta["Proteina"]),
+                    "gordura_g": _nativo(meta["Gordura"]),
+                    "carboidratos_g": _nativo(meta["Carbo"]),
+                    "fibras_g": _nativo(meta["Fibra"]),
+                },
+                "food_ids": [_nativo(item[0]) for item in itens if item[0] is not None],
+                "itens": [
+                    {"id": _nativo(item[0]), "alimento": item[1],
+                     **{k: _nativo(v) for k, v in zip(nutrientes, item[2:])}}
+                    for item in itens
+                ],
+                "totais": {k: _nativo(v) for k, v in zip(nutrientes, self._totais(itens))},
+                "saladas": [{"nome": nome, "ingredientes": ingredientes}
+                            for nome, ingredientes in dados.get("saladas", [])],
+            })
+        return plano
 
 
 if __name__ == "__main__":
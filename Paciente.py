@@ -1,7 +1,22 @@
+from itertools import repeat
+
 from HealthUtils import HealthUtils
 
 
 class Paciente:
+    # Sem __dict__ por instância: importações com centenas de milhares de pacientes
+    __slots__ = ("nome", "sexo", "idade", "peso", "altura", "nivel_atividade", "objetivo",
+                 "restricoes", "glicemia", "tg", "hdl", "ldl", "ferritina", "hemoglobina")
+
+    # Coluna do CSV para cada argumento do construtor, na ordem do __init__, e o
+    # valor padrão quando a coluna não existe (sem padrão: coluna obrigatória)
+    COLUNAS = [
+        ("nome",), ("sexo",), ("idade",), ("peso_kg",), ("altura_cm",), ("nivel_atividade",),
+        ("objetivo", "perder"), ("restricoes", "nenhuma"),
+        ("glicemia", None), ("tg", None), ("hdl", None), ("ldl", None),
+        ("ferritina", None), ("hemoglobina", None),
+    ]
+
     def __init__(self, nome, sexo, idade, peso, altura, nivel_atividade,
                  objetivo="perder", restricoes="nenhuma",
                  glicemia=None, tg=None, hdl=None, ldl=None,
@@ -41,6 +56,22 @@ class Paciente:
             hemoglobina=row.get("hemoglobina"),
         )
 
+    @classmethod
+    def from_frame(cls, df):
+        """Gera um Paciente por linha do DataFrame, sob demanda.
+
+        Mesmas colunas e padrões de `from_dataframe`, mas cada coluna vira um
+        array uma única vez em vez de criar uma Series por linha.
+        """
+        colunas = []
+        for coluna, *padrao in cls.COLUNAS:
+            if coluna in df.columns or not padrao:
+                colunas.append(df[coluna].to_numpy())
+            else:
+                colunas.append(repeat(padrao[0], len(df)))
+        for valores in zip(*colunas):
+            yield cls(*valores)
+
     def calcular_imc(self):
         return HealthUtils.calcular_imc(self.peso, self.altura)
 
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class PlanCache:
+    """Cache de refeições geradas, endereçado pelo hash das entradas efetivas.
+
+    Guarda apenas os ids dos alimentos escolhidos. A camada em memória é um
+    LRU limitado a `max_itens`; com `sqlite_path` as refeições também são
+    gravadas em um arquivo SQLite, que pode ser compartilhado entre execuções
+    e processos.
+    """
+
+    def __init__(self, max_itens=1024, sqlite_path=None):
+        self.max_itens = max_itens
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = None
+        if sqlite_path:
+            self._conn = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS planos (chave TEXT PRIMARY KEY, food_ids TEXT NOT NULL)")
+            self._conn.commit()
+
+    @staticmethod
+    def chave(**entradas):
+        """Hash estável (sha256) das entradas que determinam a refeição."""
+        texto = json.dumps(entradas, sort_keys=True, default=str)
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def get(self, chave):
+        """Ids dos alimentos guardados para a chave, ou None."""
+        with self._lock:
+            food_ids = self._memoria.get(chave)
+            if food_ids is not None:
+                self._memoria.move_to_end(chave)
+            elif self._conn is not None:
+                row = self._conn.execute("SELECT food_ids FROM planos WHERE chave = ?", (chave,)).fetchone()
+                if row:
+                    food_ids = json.loads(row[0])
+                    self._guardar_memoria(chave, food_ids)
+
+            if food_ids is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return food_ids
+
+    def set(self, chave, food_ids):
+        food_ids = [int(i) for i in food_ids]
+        with self._lock:
+            self._guardar_memoria(chave, food_ids)
+            if self._conn is not None:
+                self._conn.execute("INSERT OR REPLACE INTO planos VALUES (?, ?)", (chave, json.dumps(food_ids)))
+                self._conn.commit()
+
+    def _guardar_memoria(self, chave, food_ids):
+        self._memoria[chave] = food_ids
+        self._memoria.move_to_end(chave)
+        if len(self._memoria) > self.max_itens:
+            self._memoria.popitem(last=False)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,162 @@
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet é opcional; sem pyarrow o exportador colunar grava CSV
+    pa = pq = None
+
+
+class PlanExporter(ABC):
+    """Base dos exportadores de planos estruturados (MealPlanGenerator.gerar_plano).
+
+    Os planos são gravados um a um com `escrever`, de modo que um lote pode
+    exportar enquanto gera. Use como context manager ou chame `fechar` ao final.
+    """
+
+    def __init__(self, caminho, anexar=False):
+        self.caminho = caminho
+        self.anexar = anexar
+        self.planos = 0
+
+    @abstractmethod
+    def escrever(self, plano):
+        """Grava um plano."""
+
+    def fechar(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class JsonlPlanExporter(PlanExporter):
+    """Um plano completo por linha (JSON Lines); com `anexar=True` continua um arquivo existente."""
+
+    def __init__(self, caminho, anexar=False):
+        super().__init__(caminho, anexar)
+        self._arquivo = open(caminho, "a" if anexar else "w", encoding="utf-8")
+
+    def escrever(self, plano):
+        self._arquivo.write(json.dumps(plano, ensure_ascii=False, allow_nan=False) + "\n")
+        self.planos += 1
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class ColumnarPlanExporter(PlanExporter):
+    """Uma linha por refeição, com o perfil do paciente repetido, em Parquet ou CSV.
+
+    Sem `formato`, a extensão do caminho decide; qualquer coisa diferente de
+    .csv vira Parquet se o pyarrow estiver instalado e CSV (mesmo nome, extensão
+    .csv) caso contrário. As linhas são acumuladas e gravadas a cada `lote`
+    linhas (um row group por lote no Parquet). No CSV, `food_ids` vira uma lista
+    de ids separados por espaço. Parquet não permite anexar a um arquivo existente.
+    """
+
+    # coluna -> tipo ("str", "int", "float" ou "ids")
+    COLUNAS = {
+        "indice": "int",
+        "nome": "str", "sexo": "str", "idade": "float", "peso": "float", "altura": "float",
+        "nivel_atividade": "str", "objetivo": "str", "restricoes": "str",
+        "imc": "float", "classificacao_imc": "str", "tmb": "float", "tdee": "float",
+        "refeicao": "str",
+        "meta_kcal": "float", "meta_proteina_g": "float", "meta_gordura_g": "float",
+        "meta_carboidratos_g": "float", "meta_fibras_g": "float",
+        "food_ids": "ids",
+        "kcal": "float", "proteina_g": "float", "gordura_g": "float",
+        "carboidratos_g": "float", "fibras_g": "float",
+    }
+
+    def __init__(self, caminho, formato=None, anexar=False, lote=1000):
+        if formato is None:
+            if caminho.lower().endswith(".csv"):
+                formato = "csv"
+            elif pq is not None:
+                formato = "parquet"
+            else:
+                formato = "csv"
+                caminho = os.path.splitext(caminho)[0] + ".csv"
+        if formato not in ("parquet", "csv"):
+            raise ValueError(f"Formato '{formato}' inválido. Use 'parquet' ou 'csv'.")
+        if formato == "parquet":
+            if pq is None:
+                raise ImportError("Exportar Parquet requer o pacote pyarrow.")
+            if anexar:
+                raise ValueError("Parquet não permite anexar a um arquivo existente.")
+
+        super().__init__(caminho, anexar)
+        self.formato = formato
+        self.lote = lote
+        self._buffer = []
+        self._writer = None
+        self._arquivo = None
+
+    @staticmethod
+    def linhas(plano):
+        """Achata um plano em uma linha (dict) por refeição."""
+        paciente = plano["paciente"]
+        metricas = plano["metricas"]
+        base = {
+            "indice": plano.get("indice"),
+            **{k: paciente.get(k) for k in ["nome", "sexo", "idade", "peso", "altura",
+                                            "nivel_atividade", "objetivo", "restricoes"]},
+            **{k: metricas.get(k) for k in ["imc", "classificacao_imc", "tmb", "tdee"]},
+        }
+        return [
+            {
+                **base,
+                "refeicao": refeicao["refeicao"],
+                **{f"meta_{k}": v for k, v in refeicao["meta"].items()},
+                "food_ids": refeicao["food_ids"],
+                **refeicao["totais"],
+            }
+            for refeicao in plano["refeicoes"]
+        ]
+
+    def escrever(self, plano):
+        self._buffer.extend(self.linhas(plano))
+        self.planos += 1
+        if len(self._buffer) >= self.lote:
+            self._descarregar()
+
+    def _descarregar(self):
+        if not self._buffer:
+            return
+        if self.formato == "parquet":
+            self._descarregar_parquet()
+        else:
+            self._descarregar_csv()
+        self._buffer = []
+
+    def _descarregar_parquet(self):
+        if self._writer is None:
+            tipos = {"str": pa.string(), "int": pa.int64(), "float": pa.float64(), "ids": pa.list_(pa.int64())}
+            schema = pa.schema([(coluna, tipos[tipo]) for coluna, tipo in self.COLUNAS.items()])
+            self._writer = pq.ParquetWriter(self.caminho, schema)
+        tabela = pa.Table.from_pylist(self._buffer, schema=self._writer.schema)
+        self._writer.write_table(tabela)
+
+    def _descarregar_csv(self):
+        if self._arquivo is None:
+            novo = not (self.anexar and os.path.exists(self.caminho) and os.path.getsize(self.caminho) > 0)
+            self._arquivo = open(self.caminho, "a" if self.anexar else "w", encoding="utf-8", newline="")
+            self._writer = csv.DictWriter(self._arquivo, fieldnames=list(self.COLUNAS))
+            if novo:
+                self._writer.writeheader()
+        for linha in self._buffer:
+            self._writer.writerow({**linha, "food_ids": " ".join(str(i) for i in linha["food_ids"])})
+
+    def fechar(self):
+        self._descarregar()
+        if self.formato == "parquet" and self._writer is not None:
+            self._writer.close()
+        if self._arquivo is not None:
+            self._arquivo.close()
@@ -0,0 +1,181 @@
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from HealthUtils import HealthUtils
+from MealPlanGenerator import MealPlanGenerator
+from Paciente import Paciente
+
+
+def _rotulo(arquivo, linha, funcao):
+    """Nome de um quadro no formato colapsado (sem ';', que separa os quadros)."""
+    if arquivo == "~":  # funções embutidas no pstats
+        return funcao.replace(";", ",")
+    return f"{funcao} ({os.path.basename(arquivo)}:{linha})".replace(";", ",")
+
+
+def pilhas_cprofile(stats, profundidade_max=64):
+    """Converte um pstats.Stats em pilhas colapsadas {pilha: microssegundos}.
+
+    O cProfile só guarda arestas chamador -> chamado, não pilhas completas;
+    o tempo próprio de cada função é distribuído pelos caminhos desde as
+    raízes na proporção do tempo acumulado de cada aresta (a mesma
+    aproximação usada por ferramentas como o flameprof). Ciclos recursivos
+    são cortados no primeiro retorno à mesma função, e caminhos que somam
+    menos de 1 µs são descartados.
+    """
+    dados = stats.stats
+    chamados = {}
+    for funcao, (_, _, _, _, chamadores) in dados.items():
+        for chamador, aresta in chamadores.items():
+            chamados.setdefault(chamador, []).append((funcao, aresta[3]))
+
+    pilhas = Counter()
+
+    def visitar(funcao, caminho, fracao):
+        _, _, tempo_proprio, tempo_total, _ = dados[funcao]
+        if tempo_total * fracao < 1e-6:  # caminhos abaixo de 1 µs não aparecem no gráfico
+            return
+        caminho = caminho + [_rotulo(*funcao)]
+        if tempo_proprio * fracao > 0:
+            pilhas[";".join(caminho)] += tempo_proprio * fracao * 1e6
+        if len(caminho) >= profundidade_max:
+            return
+        for filho, tempo_aresta in chamados.get(funcao, []):
+            total_filho = dados[filho][3]
+            if filho in visitados or total_filho <= 0:
+                continue
+            visitados.add(filho)
+            visitar(filho, caminho, fracao * min(tempo_aresta / total_filho, 1.0))
+            visitados.discard(filho)
+
+    for raiz, (_, _, _, _, chamadores) in dados.items():
+        if not chamadores:
+            visitados = {raiz}
+            visitar(raiz, [], 1.0)
+    return {pilha: int(round(us)) for pilha, us in pilhas.items() if us >= 1}
+
+
+class _Amostrador(threading.Thread):
+    """Amostra a pilha de uma thread a cada `intervalo` segundos (só biblioteca padrão)."""
+
+    def __init__(self, thread_id, intervalo):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self.amostras = 0
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            quadro = sys._current_frames().get(self.thread_id)
+            pilha = []
+            while quadro is not None:
+                codigo = quadro.f_code
+                pilha.append(_rotulo(codigo.co_filename, codigo.co_firstlineno, codigo.co_name))
+                quadro = quadro.f_back
+            if pilha:
+                self.pilhas[";".join(reversed(pilha))] += 1
+                self.amostras += 1
+
+    def parar(self):
+        self._parar.set()
+        self.join()
+
+
+class PlanProfiler:
+    """Perfila o MealPlanGenerator de ponta a ponta com os CSVs reais.
+
+    Os pacientes vêm de `indices` (linhas de `pacientes_csv`) ou de uma
+    amostra de `amostra` linhas espaçadas uniformemente. Cada paciente roda
+    gerar_cardapio e gerar_markdown_final, com os catálogos carregados do
+    disco na primeira refeição como numa execução real. O modo "cprofile"
+    grava `<prefixo>.pstats` e `<prefixo>.collapsed`; o modo "amostragem"
+    usa um amostrador de pilhas em thread e grava só o `.collapsed`, que o
+    flamegraph.pl, o speedscope e afins leem.
+    """
+
+    def __init__(self, pacientes_csv="pacientes_ro.csv", indices=None, amostra=1, seed=0, run_kwargs=None):
+        self.pacientes_csv = pacientes_csv
+        self.indices = indices
+        self.amostra = amostra
+        self.seed = seed
+        self.run_kwargs = run_kwargs or {}
+
+    def _pacientes(self):
+        df = HealthUtils.load_patient_data(self.pacientes_csv)
+        indices = self.indices
+        if indices is None:
+            indices = np.unique(np.linspace(0, len(df) - 1, min(self.amostra, len(df))).astype(int))
+        return list(Paciente.from_frame(df.iloc[list(indices)]))
+
+    def _planejar(self, pacientes):
+        for paciente in pacientes:
+            generator = MealPlanGenerator(paciente, seed=self.seed, run_kwargs=self.run_kwargs)
+            generator.gerar_cardapio()
+            generator.gerar_markdown_final()
+
+    @staticmethod
+    def _salvar_colapsado(pilhas, caminho):
+        with open(caminho, "w", encoding="utf-8") as f:
+            for pilha, valor in sorted(pilhas.items()):
+                f.write(f"{pilha} {valor}\n")
+
+    def perfilar_cprofile(self, prefixo):
+        pacientes = self._pacientes()
+        perfil = cProfile.Profile()
+        inicio = time.perf_counter()
+        perfil.runcall(self._planejar, pacientes)
+        segundos = time.perf_counter() - inicio
+
+        perfil.dump_stats(f"{prefixo}.pstats")
+        stats = pstats.Stats(perfil)
+        self._salvar_colapsado(pilhas_cprofile(stats), f"{prefixo}.collapsed")
+        return stats, segundos
+
+    def perfilar_amostragem(self, prefixo, intervalo_ms=5.0):
+        pacientes = self._pacientes()
+        amostrador = _Amostrador(threading.get_ident(), intervalo_ms / 1000)
+        amostrador.start()
+        inicio = time.perf_counter()
+        try:
+            self._planejar(pacientes)
+        finally:
+            amostrador.parar()
+        segundos = time.perf_counter() - inicio
+
+        self._salvar_colapsado(amostrador.pilhas, f"{prefixo}.collapsed")
+        return amostrador, segundos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perfila a geração de cardápios com os CSVs reais.")
+    parser.add_argument("pacientes_csv", nargs="?", default="pacientes_ro.csv")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument("--indice", type=int, nargs="+", default=None, help="linha(s) do CSV a perfilar")
+    grupo.add_argument("--amostra", type=int, default=1, help="pacientes espaçados no CSV")
+    parser.add_argument("--modo", choices=["cprofile", "amostragem"], default="cprofile")
+    parser.add_argument("--intervalo-ms", type=float, default=5.0, help="intervalo do amostrador")
+    parser.add_argument("--solver", default=None, help="solver do GeneticMealPlanner (padrão: o do run)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--saida", default="perfil", help="prefixo dos arquivos gerados")
+    args = parser.parse_args()
+
+    run_kwargs = {"solver": args.solver} if args.solver else {}
+    profiler = PlanProfiler(args.pacientes_csv, args.indice, args.amostra, args.seed, run_kwargs)
+
+    if args.modo == "cprofile":
+        stats, segundos = profiler.perfilar_cprofile(args.saida)
+        stats.sort_stats("cumulative").print_stats(25)
+        print(f"{segundos:.2f}s; gravados {args.saida}.pstats e {args.saida}.collapsed")
+    else:
+        amostrador, segundos = profiler.perfilar_amostragem(args.saida, args.intervalo_ms)
+        print(f"{segundos:.2f}s, {amostrador.amostras} amostras; gravado {args.saida}.collapsed")
@@ -0,0 +1,271 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from FoodCatalog import FoodCatalog
+from MealPlanGenerator import MealPlanGenerator
+from Paciente import Paciente
+
+# Campos do JSON de paciente: os argumentos do Paciente. Só objetivo e restrições
+# têm padrão útil; sem os exames a avaliação do MealPlanGenerator falha
+CAMPOS_PACIENTE = list(Paciente.__slots__)
+CAMPOS_OBRIGATORIOS = [c for c in CAMPOS_PACIENTE if c not in ("objetivo", "restricoes")]
+CAMPOS_TEXTO = ["nome", "sexo", "nivel_atividade", "objetivo", "restricoes"]
+
+
+class _DadosInvalidos(Exception):
+    """Erro causado pelos dados do paciente (vira 422); os demais são do servidor (500)."""
+
+
+def _gerar_plano(dados, seed, run_kwargs, markdown):
+    """Planeja um paciente (função de módulo para poder ir a outro processo)."""
+    try:
+        generator = MealPlanGenerator(Paciente(**dados), seed=seed, run_kwargs=run_kwargs)
+        generator.perfil  # metas e avaliação dos exames, que dependem só dos dados
+    except (KeyError, ValueError, TypeError) as e:
+        raise _DadosInvalidos(f"{type(e).__name__}: {e}") from e
+    generator.gerar_cardapio()
+    plano = generator.gerar_plano()
+    if markdown:
+        plano["markdown"] = generator.gerar_markdown_final()
+    return plano
+
+
+def _validar(dados):
+    if not isinstance(dados, dict):
+        raise ValueError("Cada paciente deve ser um objeto JSON")
+    desconhecidos = sorted(set(dados) - set(CAMPOS_PACIENTE))
+    if desconhecidos:
+        raise ValueError(f"Campos desconhecidos: {', '.join(desconhecidos)}")
+    faltando = [c for c in CAMPOS_OBRIGATORIOS if dados.get(c) is None]
+    if faltando:
+        raise ValueError(f"Campos obrigatórios ausentes: {', '.join(faltando)}")
+    # null nos campos opcionais vale como ausente, para usar o padrão do Paciente
+    dados = {campo: valor for campo, valor in dados.items() if valor is not None}
+    nao_texto = [c for c in CAMPOS_TEXTO if c in dados and not isinstance(dados[c], str)]
+    if nao_texto:
+        raise ValueError(f"Campos que devem ser texto: {', '.join(nao_texto)}")
+    return dados
+
+
+class _Sobrecarga(Exception):
+    pass
+
+
+class _Servidor(ThreadingHTTPServer):
+    # Backlog do listen maior que o padrão (5): rajadas recebem 503, não conexão recusada
+    request_queue_size = 128
+
+
+class PlanService:
+    """Serviço HTTP local que mantém os catálogos carregados entre requisições.
+
+    POST /plano recebe um paciente (JSON com os campos do Paciente) ou uma
+    lista deles e devolve o plano de MealPlanGenerator.gerar_plano (ou a lista
+    de planos); `?markdown=1` inclui o markdown e `?seed=N` fixa a seed.
+    GET /saude informa a ocupação.
+
+    Os pacientes rodam em um pool de `max_workers` (processos por padrão, com
+    os catálogos carregados na criação de cada worker). Cabem no máximo
+    `max_workers + max_fila` pacientes em andamento; além disso a requisição
+    recebe 503 na hora, em vez de enfileirar sem limite. Um lote maior que essa
+    capacidade nunca caberia e recebe 413, sem Retry-After. Uma requisição que
+    passa de `timeout` segundos gera 504; seus pacientes ainda na fila são
+    cancelados e os que já estão rodando ocupam a vaga até terminar.
+
+    Dados de paciente que o planejamento não aceita geram 422; falhas do
+    servidor (pool quebrado, falta de memória...) geram 500. Corpos acima de
+    `max_corpo` bytes recebem 413 sem serem lidos.
+    """
+
+    def __init__(self, host="127.0.0.1", porta=8765, max_workers=None, max_fila=16,
+                 executor="process", timeout=60.0, run_kwargs=None, verboso=False, max_corpo=1_000_000):
+        self.host = host
+        self.porta = porta
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_fila = max_fila
+        self.executor = executor
+        self.timeout = timeout
+        self.run_kwargs = run_kwargs or {}
+        self.verboso = verboso
+        self.max_corpo = max_corpo
+
+        self.capacidade = self.max_workers + max_fila
+        self._vagas = threading.BoundedSemaphore(self.capacidade)
+        self._lock = threading.Lock()
+        self.em_andamento = 0
+        self.rejeitados = 0
+        self._pool = None
+        self.servidor = None
+
+    def iniciar(self):
+        """Carrega os catálogos, cria o pool e abre o socket (porta 0 escolhe uma livre)."""
+        FoodCatalog.preload()
+        if self.executor == "process":
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=FoodCatalog.preload)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        handler = type("PlanServiceHandler", (_Handler,), {"servico": self})
+        self.servidor = _Servidor((self.host, self.porta), handler)
+        self.porta = self.servidor.server_address[1]
+        return self
+
+    def servir(self):
+        self.servidor.serve_forever()
+
+    def encerrar(self):
+        if self.servidor is not None:
+            self.servidor.shutdown()
+            self.servidor.server_close()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.encerrar()
+
+    def _reservar(self, n):
+        """Reserva `n` vagas de uma vez, ou nenhuma (_Sobrecarga)."""
+        reservadas = 0
+        while reservadas < n and self._vagas.acquire(blocking=False):
+            reservadas += 1
+        if reservadas < n:
+            for _ in range(reservadas):
+                self._vagas.release()
+            with self._lock:
+                self.rejeitados += 1
+            raise _Sobrecarga()
+        with self._lock:
+            self.em_andamento += n
+
+    def _liberar(self, _future=None):
+        with self._lock:
+            self.em_andamento -= 1
+        self._vagas.release()
+
+    def planejar(self, pacientes, seed=None, markdown=False):
+        """Planeja os pacientes no pool e retorna os planos, na mesma ordem."""
+        self._reservar(len(pacientes))
+        futures = []
+        try:
+            for dados in pacientes:
+                futures.append(self._pool.submit(_gerar_plano, dados, seed, self.run_kwargs, markdown))
+                futures[-1].add_done_callback(self._liberar)
+        finally:
+            # Vagas reservadas para pacientes que não chegaram a ser submetidos
+            for _ in range(len(pacientes) - len(futures)):
+                self._liberar()
+        prazo = time.monotonic() + self.timeout
+        try:
+            return [future.result(timeout=max(prazo - time.monotonic(), 0)) for future in futures]
+        except BaseException:
+            # Timeout ou erro em um paciente do lote: os que ainda não começaram liberam a vaga já
+            for future in futures:
+                future.cancel()
+            raise
+
+    def saude(self):
+        with self._lock:
+            return {"status": "ok", "em_andamento": self.em_andamento, "rejeitados": self.rejeitados,
+                    "capacidade": self.capacidade, "max_workers": self.max_workers}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    servico = None  # definido em PlanService.iniciar
+
+    def _responder(self, status, corpo):
+        dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        if status == 503:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/saude":
+            self._responder(200, self.servico.saude())
+        else:
+            self._responder(404, {"erro": "Rota não encontrada"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/plano":
+            self._responder(404, {"erro": "Rota não encontrada"})
+            return
+
+        try:
+            parametros = parse_qs(url.query)
+            seed = int(parametros["seed"][0]) if "seed" in parametros else None
+            markdown = parametros.get("markdown", ["0"])[0] in ("1", "true")
+            tamanho = int(self.headers.get("Content-Length", 0))
+            if tamanho < 0:
+                raise ValueError("Content-Length negativo")
+            if tamanho > self.servico.max_corpo:
+                self.close_connection = True
+                self._responder(413, {"erro": f"Corpo acima de {self.servico.max_corpo} bytes"})
+                return
+            corpo = json.loads(self.rfile.read(tamanho) or b"null")
+            lote = isinstance(corpo, list)
+            pacientes = [_validar(dados) for dados in (corpo if lote else [corpo])]
+            if not pacientes:
+                raise ValueError("Lista de pacientes vazia")
+        except ValueError as e:  # inclui JSON inválido e seed não numérica
+            self._responder(400, {"erro": str(e)})
+            return
+
+        if len(pacientes) > self.servico.capacidade:
+            self._responder(413, {"erro": f"Lote de {len(pacientes)} pacientes acima da capacidade "
+                                          f"do serviço ({self.servico.capacidade})"})
+            return
+
+        try:
+            planos = self.servico.planejar(pacientes, seed, markdown)
+        except _Sobrecarga:
+            self._responder(503, {"erro": "Serviço ocupado, tente novamente"})
+        except TimeoutError:
+            self._responder(504, {"erro": f"Planejamento passou de {self.servico.timeout}s"})
+        except _DadosInvalidos as e:
+            self._responder(422, {"erro": str(e)})
+        except Exception as e:
+            self.log_error("Erro ao planejar: %r", e)
+            self._responder(500, {"erro": f"Erro interno: {type(e).__name__}"})
+        else:
+            self._responder(200, planos if lote else planos[0])
+
+    def log_message(self, formato, *args):
+        if self.servico.verboso:
+            super().log_message(formato, *args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço HTTP local de geração de cardápios.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="tamanho do pool (padrão: núcleos)")
+    parser.add_argument("--fila", type=int, default=16, help="pacientes aguardando além dos workers")
+    parser.add_argument("--executor", choices=["process", "thread"], default="process")
+    parser.add_argument("--timeout", type=float, default=60.0, help="segundos por requisição")
+    parser.add_argument("--max-corpo", type=int, default=1_000_000, help="tamanho máximo do corpo, em bytes")
+    parser.add_argument("--solver", default=None, help="solver do GeneticMealPlanner (padrão: o do run)")
+    args = parser.parse_args()
+
+    run_kwargs = {"solver": args.solver} if args.solver else {}
+    servico = PlanService(args.host, args.porta, args.workers, args.fila, args.executor, args.timeout,
+                          run_kwargs, verboso=True, max_corpo=args.max_corpo).iniciar()
+    print(f"Servindo em http://{servico.host}:{servico.porta} (POST /plano, GET /saude)")
+    try:
+        servico.servir()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servico.encerrar()
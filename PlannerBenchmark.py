@@ -0,0 +1,235 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from FoodCatalog import FoodCatalog
+from GeneticMealPlanner import GeneticMealPlanner
+from HealthUtils import HealthUtils
+from MealPlanGenerator import MealPlanGenerator
+from Paciente import Paciente
+
+SOLVERS = ["ga", "batch", "exhaustive", "auto"]
+
+
+def _medir(funcao, memoria=True):
+    """Executa `funcao` e retorna (resultado, segundos, pico de memória em bytes ou None).
+
+    O tempo vem de uma execução sem tracemalloc, que deixa o código bem mais
+    lento; o pico de memória, de uma segunda execução rastreada.
+    """
+    inicio = time.perf_counter()
+    resultado = funcao()
+    segundos = time.perf_counter() - inicio
+
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            funcao()
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return resultado, segundos, pico
+
+
+def _commit():
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return saida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class PlannerBenchmark:
+    """Mede os solvers do GeneticMealPlanner e o gerar_cardapio com os CSVs reais.
+
+    Usa `amostra` pacientes espaçados uniformemente em `pacientes_csv`. Para
+    cada paciente, refeição e solver registra tempo de parede, avaliações de
+    fitness por segundo, pico de memória (tracemalloc), melhor fitness, a
+    distância até o ótimo (da enumeração exaustiva) e a curva melhor fitness
+    x tempo. O resultado é um dicionário serializável em JSON; `comparar`
+    aponta regressões entre dois resultados (por exemplo, de commits diferentes).
+
+    O ótimo é o do espaço do blueprint. Quando uma categoria do blueprint fica
+    vazia pela restrição, a mutação do solver "ga" pode sair desse espaço, e o
+    gap dele fica negativo.
+    """
+
+    def __init__(self, pacientes_csv="pacientes_ro.csv", amostra=5, solvers=None, seed=0,
+                 run_kwargs=None, memoria=True):
+        self.pacientes_csv = pacientes_csv
+        self.amostra = amostra
+        self.solvers = solvers or SOLVERS
+        self.seed = seed
+        self.run_kwargs = run_kwargs or {}
+        self.memoria = memoria
+
+    def _pacientes(self):
+        df = HealthUtils.load_patient_data(self.pacientes_csv)
+        indices = np.unique(np.linspace(0, len(df) - 1, min(self.amostra, len(df))).astype(int))
+        return list(zip(indices.tolist(), Paciente.from_frame(df.iloc[indices])))
+
+    def _bench_planner(self, indice, paciente):
+        """Uma linha por refeição e solver, rodando o planner direto."""
+        generator = MealPlanGenerator(paciente, seed=self.seed)
+        linhas = []
+        _, tarefas = generator.preparar_refeicoes()
+        for ref, tarefa in tarefas.items():
+            planner_kwargs = tarefa[2]
+
+            otimo = None
+            for solver in self.solvers:
+                def rodar():
+                    planner = GeneticMealPlanner(**planner_kwargs)
+                    planner.run(solver=solver, history=True, **self.run_kwargs)
+                    return planner
+
+                planner, segundos, pico = _medir(rodar, self.memoria)
+                info = planner.run_info
+                linha = {
+                    "paciente": indice,
+                    "refeicao": ref,
+                    "solver": solver,
+                    "solver_efetivo": info["solver"],
+                    "combinacoes": planner._count_combinations(),
+                    "segundos": segundos,
+                    "avaliacoes": planner.evaluations,
+                    "avaliacoes_por_segundo": planner.evaluations / segundos if segundos else None,
+                    "cache_hit_rate": planner.cache_hit_rate,
+                    "geracoes": info["generations"],
+                    "melhor_fitness": info["best_fitness"],
+                    "pico_memoria_bytes": pico,
+                    "curva": info["history"],
+                }
+                if info["solver"] == "exhaustive":
+                    otimo = info["best_fitness"]
+                linhas.append(linha)
+
+            for linha in linhas[-len(self.solvers):]:
+                linha["gap_otimo"] = otimo - linha["melhor_fitness"] if otimo is not None else None
+        return linhas
+
+    def _bench_cardapio(self, indice, paciente):
+        """Uma linha por solver, com o gerar_cardapio completo (seis refeições)."""
+        linhas = []
+        for solver in self.solvers:
+            def gerar():
+                generator = MealPlanGenerator(paciente, seed=self.seed, run_kwargs={**self.run_kwargs, "solver": solver})
+                generator.gerar_cardapio()
+                return generator
+
+            _, segundos, pico = _medir(gerar, self.memoria)
+            linhas.append({"paciente": indice, "solver": solver, "segundos": segundos, "pico_memoria_bytes": pico})
+        return linhas
+
+    @staticmethod
+    def resumo(planner, cardapio):
+        """Agrega por solver: tempos, avaliações/s, fitness médio, gap médio e pico de memória."""
+        df_planner = pd.DataFrame(planner)
+        df_cardapio = pd.DataFrame(cardapio)
+        resumo = {}
+        for solver, grupo in df_planner.groupby("solver", sort=False):
+            cardapios = df_cardapio[df_cardapio["solver"] == solver]
+            resumo[solver] = {
+                "segundos_por_refeicao": float(grupo["segundos"].mean()),
+                "avaliacoes_por_segundo": float(grupo["avaliacoes"].sum() / grupo["segundos"].sum()),
+                "melhor_fitness_medio": float(grupo["melhor_fitness"].mean()),
+                "gap_otimo_medio": float(grupo["gap_otimo"].mean()) if grupo["gap_otimo"].notna().any() else None,
+                "segundos_por_cardapio": float(cardapios["segundos"].mean()) if len(cardapios) else None,
+                "pico_memoria_bytes": int(grupo["pico_memoria_bytes"].max()) if grupo["pico_memoria_bytes"].notna().any() else None,
+            }
+        return resumo
+
+    def executar(self):
+        # Catálogos já carregados: o benchmark mede o planejamento, não a leitura dos CSVs
+        FoodCatalog.preload()
+
+        planner, cardapio = [], []
+        for indice, paciente in self._pacientes():
+            planner.extend(self._bench_planner(indice, paciente))
+            cardapio.extend(self._bench_cardapio(indice, paciente))
+
+        return {
+            "ambiente": {
+                "commit": _commit(),
+                "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": sys.version.split()[0],
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+                "plataforma": platform.platform(),
+            },
+            "parametros": {
+                "pacientes_csv": self.pacientes_csv,
+                "amostra": self.amostra,
+                "solvers": self.solvers,
+                "seed": self.seed,
+                "run_kwargs": self.run_kwargs,
+            },
+            "resumo": self.resumo(planner, cardapio),
+            "planner": planner,
+            "cardapio": cardapio,
+        }
+
+
+def comparar(atual, base, limite_tempo=0.25, limite_fitness=1.0):
+    """Lista as regressões de `atual` em relação a `base` (resultados de executar()).
+
+    Conta como regressão um solver ficar mais de `limite_tempo` (fração) mais
+    lento por refeição ou por cardápio, mais de `limite_tempo` mais lento em
+    avaliações/s, ou com melhor fitness médio mais de `limite_fitness` abaixo da base.
+    """
+    regressoes = []
+    for solver, novo in atual["resumo"].items():
+        antigo = base["resumo"].get(solver)
+        if antigo is None:
+            continue
+        for campo in ["segundos_por_refeicao", "segundos_por_cardapio"]:
+            if novo[campo] and antigo[campo] and novo[campo] > antigo[campo] * (1 + limite_tempo):
+                regressoes.append(f"{solver}: {campo} {antigo[campo]:.4f} -> {novo[campo]:.4f}")
+        if novo["avaliacoes_por_segundo"] < antigo["avaliacoes_por_segundo"] / (1 + limite_tempo):
+            regressoes.append(f"{solver}: avaliacoes_por_segundo {antigo['avaliacoes_por_segundo']:.0f} -> "
+                              f"{novo['avaliacoes_por_segundo']:.0f}")
+        if novo["melhor_fitness_medio"] < antigo["melhor_fitness_medio"] - limite_fitness:
+            regressoes.append(f"{solver}: melhor_fitness_medio {antigo['melhor_fitness_medio']:.2f} -> "
+                              f"{novo['melhor_fitness_medio']:.2f}")
+    return regressoes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos solvers do GeneticMealPlanner.")
+    parser.add_argument("pacientes_csv", nargs="?", default="pacientes_ro.csv")
+    parser.add_argument("--amostra", type=int, default=5, help="pacientes medidos (espaçados no CSV)")
+    parser.add_argument("--solvers", nargs="+", default=SOLVERS, choices=SOLVERS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sem-memoria", action="store_true", help="não mede o pico de memória (mais rápido)")
+    parser.add_argument("--saida", default="benchmark.json", help="arquivo JSON com o resultado")
+    parser.add_argument("--comparar", default=None, help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--limite-tempo", type=float, default=0.25, help="piora relativa de tempo tolerada")
+    parser.add_argument("--limite-fitness", type=float, default=1.0, help="queda tolerada no fitness médio")
+    args = parser.parse_args()
+
+    resultado = PlannerBenchmark(args.pacientes_csv, args.amostra, args.solvers, args.seed,
+                                 memoria=not args.sem_memoria).executar()
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2)
+
+    for solver, r in resultado["resumo"].items():
+        gap = "-" if r["gap_otimo_medio"] is None else f"{r['gap_otimo_medio']:.2f}"
+        print(f"{solver:>10}: {r['segundos_por_refeicao'] * 1000:8.1f} ms/refeição  "
+              f"{r['avaliacoes_por_segundo']:12.0f} aval/s  fitness {r['melhor_fitness_medio']:9.2f}  gap {gap}")
+    print(f"Resultado salvo em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regressoes = comparar(resultado, json.load(f), args.limite_tempo, args.limite_fitness)
+        for r in regressoes:
+            print(f"REGRESSÃO {r}")
+        sys.exit(1 if regressoes else 0)
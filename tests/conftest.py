@@ -1,6 +1,14 @@
 import pytest
 import pandas as pd
 from Paciente import Paciente
+from FoodCatalog import FoodCatalog
+
+@pytest.fixture(autouse=True)
+def limpar_food_catalog():
+    """Evita que DataFrames mockados fiquem no cache de processo entre testes."""
+    FoodCatalog.clear()
+    yield
+    FoodCatalog.clear()
 
 @pytest.fixture
 def paciente_padrao():
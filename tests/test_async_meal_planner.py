@@ -0,0 +1,82 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from AsyncMealPlanner import AsyncMealPlanner
+from MealPlanGenerator import MealPlanGenerator, _planejar_refeicao
+from Paciente import Paciente
+
+def _planner(max_workers=3):
+    return AsyncMealPlanner(executor="thread", max_workers=max_workers, seed=4, run_kwargs={"solver": "auto"})
+
+def test_gerar_cardapio_async_igual_ao_sincrono(paciente_padrao):
+    async def gerar():
+        async with _planner() as planner:
+            return await planner.gerar_cardapio_async(paciente_padrao)
+
+    generator = asyncio.run(gerar())
+    sincrono = MealPlanGenerator(paciente_padrao, seed=4, run_kwargs={"solver": "auto"})
+    sincrono.gerar_cardapio()
+
+    assert list(generator.refeicoes_dict) == MealPlanGenerator.REFEICOES
+    assert generator.gerar_markdown_final() == sincrono.gerar_markdown_final()
+
+def test_gerar_refeicoes_entrega_na_ordem_de_conclusao(paciente_padrao):
+    def planejar_com_atraso(planner_kwargs, run_kwargs, instrumentar=False):
+        # O café da manhã demora mais, então deve ser o último a chegar
+        if planner_kwargs["refeicao"] == "cafe_da_manha":
+            time.sleep(0.2)
+        return _planejar_refeicao(planner_kwargs, run_kwargs, instrumentar)
+
+    async def coletar():
+        async with _planner(max_workers=6) as planner:
+            return [ref async for ref, _ in planner.gerar_refeicoes(paciente_padrao)]
+
+    with patch("AsyncMealPlanner._planejar_refeicao", planejar_com_atraso):
+        refeicoes = asyncio.run(coletar())
+
+    assert sorted(refeicoes) == sorted(MealPlanGenerator.REFEICOES)
+    assert refeicoes[-1] == "cafe_da_manha"
+
+def test_timeout_cancela_e_levanta(paciente_padrao):
+    def planejar_lento(planner_kwargs, run_kwargs, instrumentar=False):
+        time.sleep(0.3)
+        return _planejar_refeicao(planner_kwargs, run_kwargs, instrumentar)
+
+    async def gerar():
+        async with _planner(max_workers=1) as planner:
+            await planner.gerar_cardapio_async(paciente_padrao, timeout=0.05)
+
+    with patch("AsyncMealPlanner._planejar_refeicao", planejar_lento):
+        inicio = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(gerar())
+
+    # Só a refeição que já estava rodando termina; as outras cinco foram canceladas
+    assert time.perf_counter() - inicio < 1.0
+
+def test_gerar_lote_isola_erros(paciente_padrao):
+    invalido = Paciente("Inválido", "masculino", 40, 80, 175, "maratonista",
+                        glicemia=90, tg=120, hdl=50, ldl=100, ferritina=80, hemoglobina=14)
+
+    async def coletar():
+        async with _planner() as planner:
+            return [item async for item in planner.gerar_lote([paciente_padrao, invalido, paciente_padrao], concorrencia=2)]
+
+    resultados = {indice: (generator, erro) for indice, generator, erro in asyncio.run(coletar())}
+
+    assert sorted(resultados) == [0, 1, 2]
+    assert isinstance(resultados[1][1], KeyError)
+    assert resultados[0][1] is None and len(resultados[0][0].refeicoes_dict) == 6
+
+def test_gerar_lote_interrompido_espera_as_tarefas_canceladas(paciente_padrao):
+    async def interromper():
+        async with _planner() as planner:
+            lote = planner.gerar_lote([paciente_padrao] * 4, concorrencia=2)
+            await lote.__anext__()
+            await lote.aclose()
+            return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(interromper()) == []
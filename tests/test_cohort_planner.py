@@ -0,0 +1,59 @@
+import json
+import pandas as pd
+from unittest.mock import patch
+
+from CohortPlanner import CohortPlanner
+
+@patch('CohortPlanner.MealPlanGenerator.gerar_cardapio')
+def test_executar_isola_erros_por_paciente(mock_gerar_cardapio, tmp_path):
+    """
+    Um paciente inválido deve virar uma linha de erro no resumo sem impedir
+    que os demais tenham seus cardápios gravados.
+    """
+    pacientes_csv = tmp_path / "pacientes.csv"
+    pd.DataFrame({
+        "nome": ["Ana", "Paciente Invalido", "Bruno"], "sexo": ["Feminino", "Masculino", "Masculino"],
+        "idade": [30, 40, 50], "peso_kg": [60, 80, 90], "altura_cm": [165, 175, 180],
+        "nivel_atividade": ["leve", "maratonista", "moderado"], "objetivo": ["manter", "perder", "ganhar"],
+        "restricoes": ["nenhuma", "nenhuma", "gluten"], "glicemia": [90, 95, 110], "tg": [120, 150, 210],
+        "hdl": [55, 45, 38], "ldl": [100, 130, 170], "ferritina": [80, 25, 90], "hemoglobina": [13, 14, 15],
+    }).to_csv(pacientes_csv, index=False)
+    saida = tmp_path / "cardapios"
+
+    registros = CohortPlanner(str(pacientes_csv), str(saida), max_workers=0, chunksize=2).executar()
+
+    assert [r["status"] for r in registros] == ["ok", "erro", "ok"]
+    assert "KeyError" in registros[1]["erro"]
+    assert sorted(p.name for p in saida.glob("*.md")) == ["00000_Ana.md", "00002_Bruno.md"]
+    assert len(pd.read_csv(saida / CohortPlanner.RESUMO)) == 3
+
+@patch('CohortPlanner.MealPlanGenerator.gerar_plano', return_value={"paciente": {"nome": "x"}, "metricas": {}, "refeicoes": []})
+@patch('CohortPlanner.MealPlanGenerator.gerar_cardapio')
+def test_executar_exporta_planos_em_jsonl(mock_gerar_cardapio, mock_gerar_plano, tmp_path):
+    """Com `jsonl`, cada paciente ok vira uma linha com o índice da linha do CSV."""
+    pacientes_csv = tmp_path / "pacientes.csv"
+    pd.DataFrame({
+        "nome": ["Ana", "Bruno"], "sexo": ["Feminino", "Masculino"], "idade": [30, 50],
+        "peso_kg": [60, 90], "altura_cm": [165, 180], "nivel_atividade": ["leve", "moderado"],
+    }).to_csv(pacientes_csv, index=False)
+    jsonl = tmp_path / "planos.jsonl"
+
+    registros = CohortPlanner(str(pacientes_csv), str(tmp_path / "cardapios"), max_workers=0,
+                              jsonl=str(jsonl)).executar()
+
+    assert all("plano" not in r for r in registros)
+    assert [json.loads(linha)["indice"] for linha in jsonl.read_text(encoding="utf-8").splitlines()] == [0, 1]
+
+def test_executar_com_seed_e_solver_e_reprodutivel(tmp_path):
+    """Com seed e run_kwargs, dois lotes geram os mesmos markdowns."""
+    pacientes_csv = tmp_path / "pacientes.csv"
+    pd.read_csv("pacientes_ro.csv").head(2).to_csv(pacientes_csv, index=False)
+
+    markdowns = []
+    for saida in ["a", "b"]:
+        registros = CohortPlanner(str(pacientes_csv), str(tmp_path / saida), max_workers=0,
+                                  seed=7, run_kwargs={"solver": "auto"}).executar()
+        assert [r["status"] for r in registros] == ["ok", "ok"]
+        markdowns.append([open(r["arquivo"], encoding="utf-8").read() for r in registros])
+
+    assert markdowns[0] == markdowns[1]
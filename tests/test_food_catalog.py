@@ -0,0 +1,53 @@
+import os
+import pandas as pd
+from unittest.mock import patch
+from FoodCatalog import FoodCatalog
+
+def test_load_le_o_csv_uma_unica_vez(tmp_path):
+    """Chamadas repetidas para o mesmo arquivo devem reaproveitar o cache."""
+    caminho = tmp_path / "alimentos.csv"
+    pd.DataFrame({"id": [1, 2], "food": ["banana", "aveia"]}).to_csv(caminho, index=False)
+
+    with patch('FoodCatalog.pd.read_csv', wraps=pd.read_csv) as mock_read_csv:
+        primeiro = FoodCatalog.load(str(caminho))
+        segundo = FoodCatalog.load(str(caminho))
+
+    assert mock_read_csv.call_count == 1
+    assert list(segundo["food"]) == ["banana", "aveia"]
+    assert primeiro is not segundo
+
+def test_load_recarrega_quando_mtime_muda(tmp_path):
+    """Uma alteração no arquivo (mtime diferente) invalida a entrada do cache."""
+    caminho = tmp_path / "alimentos.csv"
+    pd.DataFrame({"id": [1], "food": ["banana"]}).to_csv(caminho, index=False)
+    FoodCatalog.load(str(caminho))
+    versao = FoodCatalog.version(str(caminho))
+
+    pd.DataFrame({"id": [1, 2], "food": ["banana", "ovo"]}).to_csv(caminho, index=False)
+    os.utime(caminho, (versao + 10, versao + 10))
+
+    recarregado = FoodCatalog.load(str(caminho))
+    assert len(recarregado) == 2
+    assert FoodCatalog.version(str(caminho)) == versao + 10
+
+def test_restricted_filtra_e_guarda_indices_por_combinacao(foods_df_mock):
+    """O filtro por restrições usa as máscaras de bits e guarda os índices por combinação."""
+    with patch('FoodCatalog.pd.read_csv', return_value=foods_df_mock):
+        veganos = FoodCatalog.restricted("almoco_jantar.csv", "vegano")
+        sem_lactose = FoodCatalog.restricted("almoco_jantar.csv", "lactointolerante,vegano")
+        todos = FoodCatalog.restricted("almoco_jantar.csv", "nenhuma")
+
+    assert veganos['vegan'].all()
+    assert list(sem_lactose['id']) == list(veganos['id'])
+    assert len(todos) == len(foods_df_mock)
+    assert len(FoodCatalog._entries[os.path.abspath("almoco_jantar.csv")]["indices"]) == 3
+
+def test_preload_carrega_todos_os_catalogos():
+    with patch('FoodCatalog.pd.read_csv', wraps=pd.read_csv) as mock_read_csv:
+        FoodCatalog.preload()
+        FoodCatalog.load("saladas.csv")
+        FoodCatalog.restricted(FoodCatalog.meal_file("ceia"), "nenhuma")
+
+    assert sorted(c.args[0] for c in mock_read_csv.call_args_list) == sorted(
+        set(FoodCatalog.MEAL_FILES.values()) | {FoodCatalog.SALADS_FILE}
+    )
@@ -93,4 +93,191 @@ def test_run_executa_sem_erros_e_retorna_dataframe(mock_read_csv, foods_df_mock)
     resultado = planner.run(pop_size=10, generations=5)
     
     assert isinstance(resultado, pd.DataFrame)
-    assert not resultado.empty
\ No newline at end of file
+    assert not resultado.empty
+
+def _fitness_referencia(planner, ind):
+    """Implementação original (pandas) do fitness, usada como referência."""
+    subset = planner.foods[planner.foods["id"].isin(ind)]
+    kcal = subset["kcal"].sum()
+    protein = subset["protein_g"].sum()
+    fat = subset["fat_g"].sum()
+    fibers = subset["fiber_g"].fillna(0).sum()
+    iron = subset["iron_mg"].fillna(0).sum()
+    sodium = subset["sodium_mg"].fillna(0).sum()
+    carbs = max(0, (kcal - (protein * 4 + fat * 9)) / 4)
+
+    penalty = (abs(planner.target_kcal - kcal) * 2 + abs((planner.target_protein_g or 0) - protein) * 5 +
+               abs((planner.target_carbs_g or 0) - carbs) * 2 + abs((planner.target_fat_g or 0) - fat) * 2 +
+               abs((planner.target_fibers_g or 0) - fibers) * 5)
+    if planner.target_protein_g and protein < planner.target_protein_g:
+        penalty += (planner.target_protein_g - protein) * 8
+    if planner.target_fibers_g and fibers < planner.target_fibers_g:
+        penalty += (planner.target_fibers_g - fibers) * 6
+    if planner.nivel_triglicerideos in ['moderado', 'alto']:
+        penalty += fat * 0.4
+    if planner.nivel_ldl in ['moderado', 'critico']:
+        penalty += fat * 0.5
+    if planner.nivel_ferro == 'baixa':
+        penalty -= iron * 1.0
+    penalty += sodium / 100
+    if kcal > planner.target_kcal * 1.15:
+        return -float("inf")
+    return -penalty + subset["category"].nunique() * 5
+
+@patch('GeneticMealPlanner.pd.read_csv')
+def test_fitness_matricial_igual_a_referencia(mock_read_csv, foods_df_mock):
+    """
+    O fitness sobre a matriz de nutrientes deve pontuar exatamente como a
+    versão original em pandas, inclusive o descarte (-inf) e a variedade.
+    """
+    mock_read_csv.return_value = foods_df_mock
+    planner = GeneticMealPlanner(
+        refeicao="almoco", target_kcal=400, target_protein_g=30, target_carbs_g=40,
+        target_fat_g=10, target_fibers_g=8, nivel_triglicerideos='alto',
+        nivel_ldl='moderado', nivel_ferro='baixa'
+    )
+
+    individuos = [[1, 2, 3], [5, 7, 6], [8, 9, 10], [2, 2, 6], [4], [], [5, 8, 4, 3]]
+    for ind in individuos:
+        assert planner._fitness(ind) == _fitness_referencia(planner, ind)
+    assert planner._fitness([5, 8, 4, 3]) == -float("inf")
+
+@patch('GeneticMealPlanner.pd.read_csv')
+def test_run_batch_retorna_um_alimento_por_slot(mock_read_csv, foods_df_mock):
+    """
+    O modo vetorizado deve devolver uma refeição que respeita o blueprint
+    e pontua o mesmo que o fitness individual.
+    """
+    mock_read_csv.return_value = foods_df_mock
+    planner = GeneticMealPlanner(refeicao="cafe_da_manha", target_kcal=300)
+
+    resultado = planner.run(pop_size=20, generations=10, solver="batch")
+
+    assert sorted(resultado["category"]) == ["cereais_e_derivados", "frutas_e_derivados", "ovos_e_derivados"]
+
+    populacao = planner._create_population(30)
+    esperado = [planner._fitness(planner._ids[linha]) for linha in populacao]
+    assert list(planner._score_positions(populacao)) == esperado
+
+@patch('GeneticMealPlanner.pd.read_csv')
+def test_run_solver_invalido(mock_read_csv, foods_df_mock):
+    mock_read_csv.return_value = foods_df_mock
+    planner = GeneticMealPlanner(refeicao="almoco")
+
+    with pytest.raises(ValueError):
+        planner.run(solver="inexistente")
+
+@patch('GeneticMealPlanner.pd.read_csv')
+def test_fitness_cache_reaproveita_cromossomos(mock_read_csv, foods_df_mock):
+    """
+    O cache deve tratar permutações do mesmo cromossomo como a mesma chave
+    e descartar a entrada menos usada ao atingir o limite.
+    """
+    mock_read_csv.return_value = foods_df_mock
+    planner = GeneticMealPlanner(refeicao="almoco", cache_size=2)
+
+    primeiro = planner._fitness([5, 7, 6])
+    assert planner._fitness([6, 5, 7]) == primeiro
+    assert (planner.cache_hits, planner.cache_misses) == (1, 1)
+
+    planner._fitness([8, 9, 10])
+    planner._fitness([5, 9, 6])
+    assert (5, 6, 7) not in planner._fitness_cache
+    assert len(planner._fitness_cache) == 2
+    assert planner.cache_hit_rate == 0.25
+
+@patch('GeneticMealPlanner.pd.read_csv')
+def test_run_exhaustive_encontra_o_otimo(mock_read_csv, foods_df_mock):
+    """
+    A enumeração exaustiva deve devolver a combinação de maior fitness
+    entre todas as possíveis para o blueprint.
+    """
+    mock_read_csv.return_value = foods_df_mock
+    planner = GeneticMealPlanner(refeicao="almoco", target_kcal=450, target_protein_g=35, target_fibers_g=8)
+
+    assert planner._count_combinations() == 2 * 2 * 3
+
+    resultado = planner.run(solver="exhaustive")
+    melhor = max(
+        planner._fitness([a, b, c])
+        for a in [5, 8] for b in [7, 9] for c in [2, 6, 10]
+    )
+    assert planner._fitness(list(resultado["id"])) == melhor
+    assert planner._fitness(list(planner.run(solver="auto")["id"])) == melhor
+
+@pytest.mark.parametrize("solver", ["ga", "batch"])
+@patch('GeneticMealPlanner.pd.read_csv')
+def test_run_com_seed_e_reprodutivel(mock_read_csv, foods_df_mock, solver):
+    """Dois planners com a mesma seed devem sortear exatamente a mesma refeição."""
+    mock_read_csv.return_value = foods_df_mock
+
+    resultados = [
+        list(GeneticMealPlanner(refeicao="almoco", target_kcal=500, seed=7).run(pop_size=10, generations=5, solver=solver)["id"])
+        for _ in range(2)
+    ]
+
+    assert resultados[0] == resultados[1]
+    assert set(GeneticMealPlanner(refeicao="almoco", seed=7)._category_index) == set(foods_df_mock["category"])
+
+@pytest.mark.parametrize("solver", ["ga", "batch"])
+@patch('GeneticMealPlanner.pd.read_csv')
+def test_run_para_por_estagnacao_e_registra_motivo(mock_read_csv, foods_df_mock, solver):
+    """Com patience, o AG deve parar antes do limite de gerações e informar o motivo."""
+    mock_read_csv.return_value = foods_df_mock
+    planner = GeneticMealPlanner(refeicao="cafe_da_manha", target_kcal=300, seed=3)
+
+    planner.run(pop_size=20, generations=500, solver=solver, patience=5)
+
+    assert planner.run_info["stop_reason"] == "patience"
+    assert planner.run_info["generations"] < 500
+
+@patch('GeneticMealPlanner.pd.read_csv')
+def test_run_para_ao_atingir_meta_ou_prazo(mock_read_csv, foods_df_mock):
+    mock_read_csv.return_value = foods_df_mock
+    planner = GeneticMealPlanner(refeicao="cafe_da_manha", target_kcal=300, seed=3)
+
+    planner.run(pop_size=20, generations=500, solver="batch", target_fitness=-1e9)
+    assert planner.run_info == {"solver": "batch", "generations": 1, "stop_reason": "target",
+                                "best_fitness": planner.run_info["best_fitness"]}
+
+    planner.run(pop_size=20, generations=10**6, solver="batch", deadline_ms=20)
+    assert planner.run_info["stop_reason"] == "deadline"
+
+    planner.run(pop_size=20, generations=3, solver="ga")
+    assert (planner.run_info["generations"], planner.run_info["stop_reason"]) == (3, "generations")
+
+@pytest.mark.parametrize("solver", ["ga", "batch"])
+@patch('GeneticMealPlanner.pd.read_csv')
+def test_elitismo_nunca_perde_o_melhor_individuo(mock_read_csv, foods_df_mock, solver):
+    """
+    Com a mesma seed, rodar mais gerações nunca pode piorar o resultado quando
+    há elitismo, e o fitness final vem da tabela sem reavaliar a população.
+    """
+    mock_read_csv.return_value = foods_df_mock
+
+    melhores = []
+    for geracoes in [1, 3, 10]:
+        planner = GeneticMealPlanner(refeicao="almoco", target_kcal=450, target_protein_g=35, seed=11)
+        resultado = planner.run(pop_size=8, generations=geracoes, solver=solver, elite=1)
+        melhores.append(planner.run_info["best_fitness"])
+        assert planner._fitness(list(resultado["id"])) == melhores[-1]
+
+    assert melhores == sorted(melhores)
+
+@pytest.mark.parametrize("solver", ["ga", "batch", "exhaustive"])
+@patch('GeneticMealPlanner.pd.read_csv')
+def test_history_registra_curva_e_avaliacoes(mock_read_csv, foods_df_mock, solver):
+    """history=True traz a curva (segundos, melhor fitness), monotônica e terminando no resultado."""
+    mock_read_csv.return_value = foods_df_mock
+    planner = GeneticMealPlanner(refeicao="almoco", target_kcal=450, seed=2)
+
+    planner.run(pop_size=10, generations=8, solver=solver, history=True)
+
+    curva = planner.run_info["history"]
+    assert len(curva) == (1 if solver == "exhaustive" else 8)
+    assert all(a[0] <= b[0] and a[1] <= b[1] for a, b in zip(curva, curva[1:]))
+    assert curva[-1][1] == planner.run_info["best_fitness"]
+    assert planner.evaluations > 0
+
+    planner.run(pop_size=10, generations=2, solver=solver)
+    assert "history" not in planner.run_info
@@ -1,5 +1,6 @@
 import pytest
 import pandas as pd
+import numpy as np
 from HealthUtils import HealthUtils
 
 # Testes para a função normalizar_texto
@@ -68,4 +69,143 @@ def test_aplicar_restricao():
     df_filtrado = HealthUtils.aplicar_restricao(df_teste, "vegano")
     
     assert len(df_filtrado) == 1
-    assert df_filtrado.iloc[0]['food'] == 'tofu'
\ No newline at end of file
+    assert df_filtrado.iloc[0]['food'] == 'tofu'
+
+def test_aplicar_restricao_combinada():
+    """Restrições separadas por vírgula devem ser aplicadas em conjunto."""
+    df_teste = pd.DataFrame({
+        'food': ['pao', 'tofu', 'arroz', 'frango'],
+        'vegan': [True, True, True, False],
+        'contains_gluten': [True, False, False, False],
+        'sodium_mg': [500, 7, None, 74]
+    })
+
+    df_filtrado = HealthUtils.aplicar_restricao(df_teste, "vegano, gluten,Hipertensão")
+
+    assert list(df_filtrado['food']) == ['tofu', 'arroz']
+
+def test_bits_alimentos_e_bits_restricao():
+    """O AND entre as máscaras de bits deve reproduzir o filtro por DataFrame."""
+    df_teste = pd.DataFrame({
+        'food': ['leite', 'pao', 'tofu'],
+        'contains_lactose': [True, False, False], 'contains_milk': [True, False, False],
+        'contains_gluten': [False, True, False],
+    })
+
+    flags = HealthUtils.bits_alimentos(df_teste)
+    bits = HealthUtils.bits_restricao("lactointolerante,gluten")
+
+    assert list((flags & bits) == 0) == [False, False, True]
+    assert HealthUtils.bits_restricao("nenhuma") == 0
+
+def test_bits_alimentos_sem_coluna_da_restricao_proibe_todos():
+    """Sem a coluna do alérgeno no catálogo, nenhum alimento passa pela restrição."""
+    df_teste = pd.DataFrame({
+        'food': ['amendoim', 'arroz'],
+        'contains_gluten': [False, False],
+    })
+
+    flags = HealthUtils.bits_alimentos(df_teste)
+
+    assert list((flags & HealthUtils.bits_restricao("alergia_amendoim")) == 0) == [False, False]
+    assert list((flags & HealthUtils.bits_restricao("gluten")) == 0) == [True, True]
+
+def test_aplicar_restricao_sem_coluna_da_restricao_retorna_vazio():
+    """aplicar_restricao segue a mesma regra de bits_alimentos quando falta a coluna."""
+    df_teste = pd.DataFrame({
+        'food': ['amendoim', 'arroz'],
+        'contains_gluten': [False, False],
+    })
+
+    assert HealthUtils.aplicar_restricao(df_teste, "alergia_amendoim").empty
+    assert HealthUtils.aplicar_restricao(df_teste, "gluten, alergia_amendoim").empty
+    assert list(HealthUtils.aplicar_restricao(df_teste, "gluten")['food']) == ['amendoim', 'arroz']
+
+def _igual(a, b):
+    return (pd.isna(a) and pd.isna(b)) or a == b
+
+def test_calcular_metricas_coorte_igual_as_funcoes_escalares():
+    """A versão vetorizada deve reproduzir exatamente as funções escalares linha a linha."""
+    df = pd.read_csv("pacientes_ro.csv")
+    df.loc[0, "altura_cm"] = 0
+    df.loc[2, "altura_cm"] = np.nan
+    df.loc[1, ["glicemia", "tg", "ldl", "hdl"]] = [100, 200, 160, 40]
+
+    resultado = HealthUtils.calcular_metricas_coorte(df)
+
+    for i in range(len(df)):
+        row = df.iloc[i]
+        imc, classificacao = HealthUtils.calcular_imc(row["peso_kg"], row["altura_cm"])
+        assert resultado["imc_class"].iloc[i] == classificacao
+        assert _igual(resultado["imc"].iloc[i], imc)
+
+        tmb, tdee = HealthUtils.calcular_tbm_tdee_calorias(
+            row["sexo"], row["idade"], row["peso_kg"], row["altura_cm"], row["nivel_atividade"], row["objetivo"]
+        )
+        assert _igual(resultado["tmb"].iloc[i], tmb) and _igual(resultado["tdee"].iloc[i], tdee)
+
+        if pd.notna(tmb):  # com altura NaN o metas_macros escalar não consegue arredondar a TMB
+            macros = HealthUtils.metas_macros(tmb, round(tdee, 2), row["peso_kg"], row["sexo"], row["idade"], row["altura_cm"],
+                                              row["nivel_atividade"], row["objetivo"], row["glicemia"], row["tg"])
+            for chave in ["total_kcal", "proteina_g", "gordura_g", "carboidratos_g", "fibras_g"]:
+                assert _igual(resultado[chave].iloc[i], macros[chave])
+
+        colesterol = HealthUtils.avaliar_colesterol(row["ldl"], row["hdl"])
+        assert resultado["nivel_glicemia"].iloc[i] == HealthUtils.avaliar_glicemia(row["glicemia"])
+        assert resultado["nivel_triglicerideos"].iloc[i] == HealthUtils.avaliar_triglicerideos(row["tg"])
+        assert resultado["nivel_ldl"].iloc[i] == colesterol["ldl"]
+        assert resultado["nivel_hdl"].iloc[i] == colesterol["hdl"]
+        assert resultado["nivel_ferro"].iloc[i] == HealthUtils.avaliar_ferro(row["ferritina"], row["hemoglobina"])
+
+def test_normalizar_texto_memoriza_valores_repetidos():
+    HealthUtils.normalizar_texto.cache_clear()
+    for _ in range(3):
+        assert HealthUtils.normalizar_texto("Sedentário") == "sedentario"
+
+    info = HealthUtils.normalizar_texto.cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+
+def test_normalizar_serie_retorna_categorias_canonicas():
+    serie = pd.Series(["Feminino", "MASCULINO", "feminino ", None, "f"])
+
+    resultado = HealthUtils.normalizar_serie(serie, "sexo")
+
+    assert list(resultado.cat.categories) == ["masculino", "feminino", "f"]
+    assert resultado.tolist()[:3] == ["feminino", "masculino", "feminino"]
+    assert pd.isna(resultado.iloc[3])
+    assert resultado.iloc[4] == "f"
+
+def test_carregar_pacientes_em_blocos_usa_dtypes_compactos(tmp_path):
+    caminho = tmp_path / "pacientes.csv"
+    pd.DataFrame({
+        "nome": ["Ana", "Bruno", "Carla"], "sexo": ["Feminino", "Masculino", "Feminino"],
+        "idade": [30, 50, 41], "peso_kg": [60.5, 85.0, 70.2], "altura_cm": [165, 178, 170],
+        "nivel_atividade": ["leve", "moderado", "leve"], "glicemia": [95.4, 130.0, 101.2],
+    }).to_csv(caminho, index=False)
+
+    blocos = list(HealthUtils.carregar_pacientes_em_blocos(str(caminho), chunksize=2))
+
+    assert [len(b) for b in blocos] == [2, 1]
+    assert list(blocos[1].index) == [2]
+    assert blocos[0]["sexo"].dtype == "category"
+    assert blocos[0]["glicemia"].dtype == np.float32
+    assert blocos[0]["peso_kg"].dtype == np.float64
+
+def test_carregar_pacientes_gera_pacientes_com_numero_da_linha(tmp_path):
+    caminho = tmp_path / "pacientes.csv"
+    pd.DataFrame({
+        "nome": ["Ana", "Bruno"], "sexo": ["Feminino", "Masculino"], "idade": [30, 50],
+        "peso_kg": [60.5, 85.0], "altura_cm": [165, 178], "nivel_atividade": ["leve", "moderado"],
+    }).to_csv(caminho, index=False)
+
+    pacientes = list(HealthUtils.carregar_pacientes(str(caminho), chunksize=1))
+
+    assert [(i, p.nome) for i, p in pacientes] == [(0, "Ana"), (1, "Bruno")]
+    assert pacientes[1][1].objetivo == "perder"
+
+def test_carregar_pacientes_valida_colunas_obrigatorias(tmp_path):
+    caminho = tmp_path / "pacientes.csv"
+    pd.DataFrame({"nome": ["Ana"], "sexo": ["Feminino"]}).to_csv(caminho, index=False)
+
+    with pytest.raises(ValueError, match="peso_kg"):
+        next(HealthUtils.carregar_pacientes_em_blocos(str(caminho)))
@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import patch
+
+from Instrumentation import Instrumentation
+from MealPlanGenerator import MealPlanGenerator
+
+@pytest.fixture(autouse=True)
+def instrumentation_limpa():
+    Instrumentation.limpar()
+    yield
+    Instrumentation.ativar(False)
+    Instrumentation.limpar()
+
+@patch('pandas.read_csv')
+def test_desligada_nao_registra_nada(mock_read_csv, paciente_padrao, foods_df_mock, saladas_df_mock):
+    mock_read_csv.side_effect = lambda caminho, *a, **k: saladas_df_mock if "saladas" in caminho else foods_df_mock
+
+    generator = MealPlanGenerator(paciente=paciente_padrao, seed=1, run_kwargs={"generations": 3})
+    generator.gerar_cardapio()
+    generator.gerar_markdown_final()
+
+    assert Instrumentation.registros() == []
+    assert "metricas" not in generator.refeicoes_dict["almoco"]["run_info"]
+
+@patch('pandas.read_csv')
+def test_ligada_registra_fases_e_contadores(mock_read_csv, paciente_padrao, foods_df_mock, saladas_df_mock):
+    mock_read_csv.side_effect = lambda caminho, *a, **k: saladas_df_mock if "saladas" in caminho else foods_df_mock
+    Instrumentation.ativar()
+
+    generator = MealPlanGenerator(paciente=paciente_padrao, seed=1, run_kwargs={"generations": 3})
+    generator.gerar_cardapio()
+    generator.gerar_markdown_final()
+
+    registros = Instrumentation.registros()
+    planejamento = [r for r in registros if r["fase"] == "planejamento"]
+    assert [r["refeicao"] for r in planejamento] == list(generator.refeicoes_dict)
+    almoco = planejamento[2]
+    assert almoco["paciente"] == paciente_padrao.nome
+    assert almoco["geracoes"] == 3
+    assert almoco["fitness_calls"] == almoco["cache_hits"] + almoco["cache_misses"] > 0
+    assert 0 <= almoco["fitness_s"] <= almoco["run_s"]
+    assert almoco["candidatos"]["carnes_e_derivados"] == 1
+    assert "metricas" not in generator.refeicoes_dict["almoco"]["run_info"]
+    assert [r["fase"] for r in registros].count("render") == 1
+
+    texto = Instrumentation.prometheus()
+    assert "# TYPE mealplan_generations_total counter" in texto
+    assert 'mealplan_generations_total{refeicao="almoco"} 3.0' in texto
+    assert "mealplan_renders_total 1.0" in texto
+
+@patch('pandas.read_csv')
+def test_fitness_calls_conta_individuos_do_solver_batch(mock_read_csv, paciente_padrao, foods_df_mock, saladas_df_mock):
+    mock_read_csv.side_effect = lambda caminho, *a, **k: saladas_df_mock if "saladas" in caminho else foods_df_mock
+    Instrumentation.ativar()
+
+    generator = MealPlanGenerator(paciente=paciente_padrao, seed=1,
+                                  run_kwargs={"solver": "batch", "pop_size": 20, "generations": 3})
+    generator.gerar_cardapio()
+
+    almoco = [r for r in Instrumentation.registros() if r["fase"] == "planejamento"][2]
+    assert almoco["cache_hits"] == almoco["cache_misses"] == 0
+    assert almoco["fitness_calls"] == almoco["avaliacoes"] > 0
+    assert 'mealplan_fitness_calls_total{refeicao="almoco"} 0' not in Instrumentation.prometheus()
+
+def test_coletar_esvazia_os_registros():
+    Instrumentation.registrar(fase="render", paciente="Ana", segundos=0.1)
+
+    assert Instrumentation.coletar() == [{"fase": "render", "paciente": "Ana", "segundos": 0.1}]
+    assert Instrumentation.registros() == []
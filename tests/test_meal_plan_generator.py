@@ -1,9 +1,12 @@
+import io
 import pytest
 import pandas as pd
 from unittest.mock import patch, MagicMock
 
 from MealPlanGenerator import MealPlanGenerator
 from Paciente import Paciente
+from PlanCache import PlanCache
+from HealthUtils import HealthUtils
 
 def test_inicializacao_calcula_metricas_corretamente(paciente_padrao, saladas_df_mock):
     """Testa se o construtor da classe calcula corretamente as métricas de saúde."""
@@ -114,4 +117,143 @@ def test_gerar_cardapio_pula_refeicao_sem_meta(mock_planner, mock_divisao, pacie
         generator = MealPlanGenerator(paciente=paciente_padrao)
         generator.gerar_cardapio()
 
-    assert mock_planner.call_count == 1
\ No newline at end of file
+    assert mock_planner.call_count == 1
+
+@patch('MealPlanGenerator.GeneticMealPlanner')
+def test_seed_gera_markdown_identico(mock_planner, paciente_padrao, saladas_df_mock):
+    """Com a mesma seed, o cardápio (inclusive as saladas sorteadas) deve ser idêntico."""
+    mock_planner.return_value.run.return_value = pd.DataFrame(
+        {'id': [1], 'food': ['banana'], 'kcal': [105], 'protein_g': [1.3], 'fat_g': [0.4], 'fiber_g': [3.1]}
+    )
+
+    markdowns = []
+    with patch('pandas.read_csv', return_value=saladas_df_mock):
+        for _ in range(2):
+            generator = MealPlanGenerator(paciente=paciente_padrao, seed=123)
+            generator.gerar_cardapio()
+            markdowns.append(generator.gerar_markdown_final())
+
+    seeds = [c.kwargs["seed"] for c in mock_planner.call_args_list]
+    assert markdowns[0] == markdowns[1]
+    assert seeds[:6] == seeds[6:]
+    assert len(set(seeds[:6])) == 6
+    assert MealPlanGenerator(paciente=paciente_padrao)._semente("almoco") is None
+
+@patch('MealPlanGenerator.GeneticMealPlanner')
+def test_plan_cache_evita_rodar_o_planner_de_novo(mock_planner, paciente_padrao):
+    """Um segundo paciente com as mesmas entradas efetivas deve vir inteiro do cache."""
+    mock_planner.return_value.run.return_value = pd.DataFrame({'id': [52, 7], 'food': ['pao', 'aveia']})
+    cache = PlanCache()
+
+    primeiro = MealPlanGenerator(paciente=paciente_padrao, seed=1, plan_cache=cache)
+    primeiro.gerar_cardapio()
+    segundo = MealPlanGenerator(paciente=paciente_padrao, seed=1, plan_cache=cache)
+    segundo.gerar_cardapio()
+
+    assert mock_planner.call_count == 6
+    assert cache.hits == 6
+    assert list(segundo.refeicoes_dict["cafe_da_manha"]["foods"]["id"]) == [52, 7]
+
+@patch('MealPlanGenerator.GeneticMealPlanner')
+def test_gerar_cardapio_em_threads_mantem_ordem_das_refeicoes(mock_planner, paciente_padrao):
+    """Com executor, as refeições rodam em paralelo mas voltam na ordem canônica."""
+    mock_planner.return_value.run.return_value = pd.DataFrame({'id': [1], 'food': ['banana']})
+
+    generator = MealPlanGenerator(paciente=paciente_padrao, executor="thread")
+    generator.gerar_cardapio()
+
+    assert mock_planner.call_count == 6
+    assert list(generator.refeicoes_dict) == ["cafe_da_manha", "lanche_manha", "almoco", "lanche_tarde", "jantar", "ceia"]
+
+@patch('MealPlanGenerator.GeneticMealPlanner')
+def test_executor_thread_reaproveita_o_pool_entre_cardapios(mock_planner, paciente_padrao):
+    """O pool de executor="thread" é criado uma vez e compartilhado entre instâncias."""
+    mock_planner.return_value.run.return_value = pd.DataFrame({'id': [1], 'food': ['banana']})
+
+    try:
+        MealPlanGenerator(paciente=paciente_padrao, executor="thread").gerar_cardapio()
+        pool = MealPlanGenerator._pools["thread"]
+        MealPlanGenerator(paciente=paciente_padrao, executor="thread").gerar_cardapio()
+
+        assert MealPlanGenerator._pools["thread"] is pool
+        assert mock_planner.call_count == 12
+    finally:
+        MealPlanGenerator.encerrar_pools()
+
+    assert MealPlanGenerator._pools == {}
+
+@patch('MealPlanGenerator.GeneticMealPlanner')
+def test_gerar_refeicao_reaproveita_perfil(mock_planner, paciente_padrao):
+    """Regenerar uma refeição não recalcula metas nem exames, só roda o planner dela."""
+    mock_planner.return_value.run.return_value = pd.DataFrame({'id': [1], 'food': ['banana']})
+
+    with patch('MealPlanGenerator.HealthUtils.divisao_refeicoes', wraps=HealthUtils.divisao_refeicoes) as mock_divisao:
+        generator = MealPlanGenerator(paciente=paciente_padrao, seed=5)
+        generator.gerar_cardapio()
+        generator.gerar_refeicao("almoco", variante=2)
+
+    assert mock_divisao.call_count == 1
+    assert mock_planner.call_count == 7
+    seeds_almoco = [c.kwargs["seed"] for c in mock_planner.call_args_list if c.kwargs["refeicao"] == "almoco"]
+    assert seeds_almoco[0] != seeds_almoco[1]
+    assert list(generator.refeicoes_dict)[2] == "almoco"
+
+def test_escrever_markdown_em_stream_igual_ao_markdown_final(paciente_padrao, saladas_df_mock):
+    """Escrever direto no stream produz exatamente o mesmo documento de gerar_markdown_final."""
+    generator = MealPlanGenerator(paciente=paciente_padrao, seed=3)
+    generator.refeicoes_dict = {
+        "lanche_manha": {"meta": {"Kcal": 200}, "foods": pd.DataFrame({'id': [1], 'food': ['banana'], 'kcal': [89], 'protein_g': [1.1], 'fat_g': [0.3], 'fiber_g': [2.6]})},
+        "almoco": {"meta": {"Kcal": 600}, "foods": pd.DataFrame()},
+    }
+
+    stream = io.StringIO()
+    generator.escrever_markdown(stream)
+
+    assert stream.getvalue() == generator.gerar_markdown_final()
+    assert "| Banana | 89 | 1.1 | 0.3 |" in stream.getvalue()
+
+def test_gerar_plano_traz_os_mesmos_numeros_do_markdown(paciente_padrao, saladas_df_mock):
+    """O plano estruturado tem ids, metas e os totais da tabela (incluindo o queijo do lanche)."""
+    with patch('pandas.read_csv', return_value=saladas_df_mock):
+        generator = MealPlanGenerator(paciente=paciente_padrao)
+
+    meta = {"Kcal": 300.0, "Proteina": 15.0, "Carbo": 40.0, "Gordura": 10.0, "Fibra": 5.0}
+    foods_df_falso = pd.DataFrame({'id': [1], 'food': ['maca'], 'kcal': [95], 'protein_g': [0.5], 'fat_g': [0.3], 'fiber_g': [4]})
+    generator.refeicoes_dict = {"lanche_tarde": {"meta": meta, "foods": foods_df_falso}}
+
+    plano = generator.gerar_plano()
+    refeicao = plano["refeicoes"][0]
+
+    assert plano["paciente"]["nome"] == paciente_padrao.nome
+    assert plano["metricas"]["imc"] == generator.imc
+    assert refeicao["meta"]["kcal"] == 300.0
+    assert refeicao["food_ids"] == [1]
+    assert [item["id"] for item in refeicao["itens"]] == [1, None]
+    assert refeicao["totais"]["kcal"] == 185
+    assert type(refeicao["totais"]["kcal"]) is int
+    assert f"**Total Nutricional:** {refeicao['totais']['kcal']} kcal" in generator.gerar_markdown_final()
+
+@patch('MealPlanGenerator.GeneticMealPlanner')
+def test_gerar_plano_metricas_e_saladas_iguais_ao_markdown(mock_planner):
+    """Sem seed, o plano traz a TMB exata e as mesmas saladas sorteadas para o markdown."""
+    mock_planner.return_value.run.return_value = pd.DataFrame(
+        {'id': [1], 'food': ['maca'], 'kcal': [95], 'protein_g': [0.5], 'fat_g': [0.3], 'fiber_g': [4]}
+    )
+    paciente = Paciente.from_dataframe(pd.read_csv("pacientes_ro.csv").iloc[0])
+    generator = MealPlanGenerator(paciente=paciente)
+    generator.gerar_cardapio()
+
+    markdown = generator.gerar_markdown_final()
+    plano = generator.gerar_plano()
+    metricas = plano["metricas"]
+
+    assert f"**- IMC:** {metricas['imc']} ({metricas['classificacao_imc']})" in markdown
+    assert f"**- *TMB:** {metricas['tmb']} kcal" in markdown
+    assert f"**- TDEE:** {metricas['tdee']:.2f} kcal" in markdown
+    assert f"**{metricas['agua_l']} litros de água**" in markdown
+    assert (f"{metricas['proteina_g']} g proteínas, {metricas['gordura_g']} g gorduras, "
+            f"{metricas['carboidratos_g']} g carboidratos, {metricas['fibras_g']} g fibras") in markdown
+    for refeicao in plano["refeicoes"]:
+        for salada in refeicao["saladas"]:
+            assert f"- {salada['nome']}: " + ", ".join(salada["ingredientes"]) in markdown
+    assert sum(len(r["saladas"]) for r in plano["refeicoes"]) == 6
@@ -73,4 +73,31 @@ def test_avaliar_exames_delega_corretamente(mocker, paciente_padrao):
     mock_ferro.assert_called_once_with(paciente_padrao.ferritina, paciente_padrao.hemoglobina)
     
     assert "glicemia" in resultado
-    assert resultado["ferro"] == 'normal'
\ No newline at end of file
+    assert resultado["ferro"] == 'normal'
+
+def test_from_frame_equivale_a_from_dataframe_por_linha():
+    """from_frame gera os mesmos pacientes que from_dataframe aplicado linha a linha."""
+    df = pd.DataFrame({
+        "nome": ["Ana", "Bruno"], "sexo": ["feminino", "masculino"], "idade": [30, 50],
+        "peso_kg": [60.5, 85.0], "altura_cm": [165, 178], "nivel_atividade": ["leve", "moderado"],
+        "restricoes": ["gluten", "nenhuma"], "glicemia": [95.0, None],
+    })
+
+    pacientes = list(Paciente.from_frame(df))
+
+    assert len(pacientes) == 2
+    for i, paciente in enumerate(pacientes):
+        esperado = Paciente.from_dataframe(df.iloc[i])
+        for campo in Paciente.__slots__:
+            valor, valor_esperado = getattr(paciente, campo), getattr(esperado, campo)
+            assert valor == valor_esperado or (pd.isna(valor) and pd.isna(valor_esperado))
+    assert pacientes[1].objetivo == "perder"
+    assert pacientes[0].hemoglobina is None
+
+def test_from_frame_exige_colunas_obrigatorias():
+    with pytest.raises(KeyError):
+        list(Paciente.from_frame(pd.DataFrame({"nome": ["Ana"]})))
+
+def test_paciente_nao_tem_dict(paciente_padrao):
+    with pytest.raises(AttributeError):
+        paciente_padrao.apelido = "Jo"
@@ -0,0 +1,26 @@
+from PlanCache import PlanCache
+
+def test_chave_independe_da_ordem_das_entradas():
+    assert PlanCache.chave(refeicao="almoco", seed=1) == PlanCache.chave(seed=1, refeicao="almoco")
+    assert PlanCache.chave(refeicao="almoco", seed=1) != PlanCache.chave(refeicao="almoco", seed=2)
+
+def test_memoria_lru_descarta_o_menos_usado():
+    cache = PlanCache(max_itens=2)
+    cache.set("a", [1, 2])
+    cache.set("b", [3])
+    assert cache.get("a") == [1, 2]
+    cache.set("c", [4])
+
+    assert cache.get("b") is None
+    assert cache.get("c") == [4]
+    assert (cache.hits, cache.misses) == (2, 1)
+
+def test_sqlite_persiste_entre_instancias(tmp_path):
+    caminho = str(tmp_path / "planos.sqlite")
+    cache = PlanCache(sqlite_path=caminho)
+    cache.set("chave", [52, 7])
+    cache.close()
+
+    novo = PlanCache(sqlite_path=caminho)
+    assert novo.get("chave") == [52, 7]
+    novo.close()
@@ -0,0 +1,72 @@
+import json
+
+import pandas as pd
+import pytest
+
+import PlanExporter
+from PlanExporter import JsonlPlanExporter, ColumnarPlanExporter
+
+def _plano(indice, nome):
+    return {
+        "indice": indice,
+        "paciente": {"nome": nome, "sexo": "Feminino", "idade": 30, "peso": 60.0, "altura": 165,
+                     "nivel_atividade": "leve", "objetivo": "manter", "restricoes": "nenhuma"},
+        "metricas": {"imc": 22.04, "classificacao_imc": "peso normal", "tmb": 1350, "tdee": 1856.25},
+        "refeicoes": [
+            {"refeicao": refeicao, "meta": {"kcal": 400.0, "proteina_g": 20.0, "gordura_g": 12.0,
+                                            "carboidratos_g": 50.0, "fibras_g": 6.0},
+             "food_ids": ids, "itens": [],
+             "totais": {"kcal": 390.0, "proteina_g": 18.5, "gordura_g": 11.0,
+                        "carboidratos_g": 52.1, "fibras_g": 5.5}}
+            for refeicao, ids in [("almoco", [3, 9]), ("ceia", [])]
+        ],
+    }
+
+def test_jsonl_anexa_um_plano_por_linha(tmp_path):
+    caminho = str(tmp_path / "planos.jsonl")
+    with JsonlPlanExporter(caminho) as exportador:
+        exportador.escrever(_plano(0, "Ana"))
+    with JsonlPlanExporter(caminho, anexar=True) as exportador:
+        exportador.escrever(_plano(1, "Bruno"))
+
+    with open(caminho, encoding="utf-8") as f:
+        planos = [json.loads(linha) for linha in f]
+    assert [p["paciente"]["nome"] for p in planos] == ["Ana", "Bruno"]
+    assert planos[0]["refeicoes"][0]["food_ids"] == [3, 9]
+
+def test_colunar_csv_grava_uma_linha_por_refeicao_em_lotes(tmp_path):
+    caminho = str(tmp_path / "planos.csv")
+    with ColumnarPlanExporter(caminho, lote=3) as exportador:
+        for i in range(3):
+            exportador.escrever(_plano(i, f"Paciente_{i}"))
+    with ColumnarPlanExporter(caminho, anexar=True) as exportador:
+        exportador.escrever(_plano(3, "Paciente_3"))
+
+    df = pd.read_csv(caminho, keep_default_na=False)
+    assert list(df.columns) == list(ColumnarPlanExporter.COLUNAS)
+    assert len(df) == 8
+    assert list(df["indice"]) == [0, 0, 1, 1, 2, 2, 3, 3]
+    assert list(df["food_ids"][:2]) == ["3 9", ""]
+    assert df["meta_kcal"].iloc[0] == 400.0
+
+def test_colunar_sem_pyarrow_cai_para_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(PlanExporter, "pq", None)
+
+    exportador = ColumnarPlanExporter(str(tmp_path / "planos.parquet"))
+    assert exportador.formato == "csv"
+    assert exportador.caminho.endswith("planos.csv")
+    exportador.fechar()
+
+    with pytest.raises(ImportError):
+        ColumnarPlanExporter(str(tmp_path / "planos.parquet"), formato="parquet")
+
+def test_colunar_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    caminho = str(tmp_path / "planos.parquet")
+    with ColumnarPlanExporter(caminho, lote=1) as exportador:
+        exportador.escrever(_plano(0, "Ana"))
+        exportador.escrever(_plano(1, "Bruno"))
+
+    df = pd.read_parquet(caminho)
+    assert len(df) == 4
+    assert list(df["food_ids"].iloc[0]) == [3, 9]
@@ -0,0 +1,33 @@
+import cProfile
+import pstats
+import threading
+import time
+
+from PlanProfiler import pilhas_cprofile, _Amostrador
+
+def _folha():
+    return sum(i * i for i in range(20000))
+
+def _meio():
+    return [_folha() for _ in range(5)]
+
+def test_pilhas_cprofile_reconstroi_caminhos_ate_as_folhas():
+    perfil = cProfile.Profile()
+    perfil.runcall(_meio)
+
+    pilhas = pilhas_cprofile(pstats.Stats(perfil))
+
+    caminhos = [[quadro.split(" ")[0] for quadro in p.split(";")] for p in pilhas]
+    assert any("_meio" in c and "_folha" in c and c.index("_meio") < c.index("_folha") for c in caminhos)
+    assert all(valor >= 1 for valor in pilhas.values())
+
+def test_amostrador_captura_a_pilha_da_thread_alvo():
+    amostrador = _Amostrador(threading.get_ident(), 0.001)
+    amostrador.start()
+    fim = time.perf_counter() + 0.1
+    while time.perf_counter() < fim:
+        _meio()
+    amostrador.parar()
+
+    assert amostrador.amostras > 0
+    assert any("_meio (test_plan_profiler.py" in pilha for pilha in amostrador.pilhas)
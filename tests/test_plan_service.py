@@ -0,0 +1,123 @@
+import http.client
+import json
+import threading
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+import pytest
+
+from PlanService import PlanService
+
+PACIENTE = {
+    "nome": "Ana", "sexo": "Feminino", "idade": 30, "peso": 60.0, "altura": 165,
+    "nivel_atividade": "leve", "objetivo": "manter", "restricoes": "nenhuma",
+    "glicemia": 90, "tg": 120, "hdl": 55, "ldl": 100, "ferritina": 80, "hemoglobina": 13,
+}
+
+@pytest.fixture
+def servico():
+    servico = PlanService(porta=0, max_workers=1, max_fila=0, executor="thread", timeout=10,
+                          run_kwargs={"solver": "auto"}).iniciar()
+    thread = threading.Thread(target=servico.servir, daemon=True)
+    thread.start()
+    yield servico
+    servico.encerrar()
+
+def _post(servico, corpo, query=""):
+    requisicao = urllib.request.Request(
+        f"http://127.0.0.1:{servico.porta}/plano{query}", data=json.dumps(corpo).encode("utf-8"),
+        headers={"Content-Type": "application/json"}, method="POST",
+    )
+    try:
+        with urllib.request.urlopen(requisicao) as resposta:
+            return resposta.status, json.loads(resposta.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_post_plano_devolve_plano_estruturado(servico):
+    status, plano = _post(servico, PACIENTE, "?seed=3&markdown=1")
+
+    assert status == 200
+    assert plano["paciente"]["nome"] == "Ana"
+    assert [r["refeicao"] for r in plano["refeicoes"]][0] == "cafe_da_manha"
+    assert plano["markdown"].startswith("# 🍽️ Cardápio Diário Personalizado")
+    assert _post(servico, PACIENTE, "?seed=3")[1]["refeicoes"] == plano["refeicoes"]
+
+def test_post_plano_valida_campos(servico):
+    status, corpo = _post(servico, {"nome": "Ana", "apelido": "A"})
+    assert status == 400
+    assert "apelido" in corpo["erro"]
+
+    status, corpo = _post(servico, {k: v for k, v in PACIENTE.items() if k != "peso"})
+    assert status == 400
+    assert "peso" in corpo["erro"]
+
+    status, corpo = _post(servico, {**PACIENTE, "restricoes": 5})
+    assert status == 400
+    assert "restricoes" in corpo["erro"]
+
+    status, corpo = _post(servico, {**PACIENTE, "nivel_atividade": "maratonista"})
+    assert status == 422
+    assert "KeyError" in corpo["erro"]
+
+def test_post_plano_opcional_nulo_usa_o_padrao(servico):
+    status, plano = _post(servico, {**PACIENTE, "restricoes": None, "objetivo": None})
+
+    assert status == 200
+    assert plano["paciente"]["restricoes"] == "nenhuma"
+    assert plano["paciente"]["objetivo"] == "perder"
+
+def test_post_plano_recusa_content_length_negativo(servico):
+    conexao = http.client.HTTPConnection("127.0.0.1", servico.porta, timeout=5)
+    conexao.putrequest("POST", "/plano")
+    conexao.putheader("Content-Length", "-1")
+    conexao.endheaders()
+    resposta = conexao.getresponse()
+
+    assert resposta.status == 400
+    assert "negativo" in json.loads(resposta.read())["erro"]
+    conexao.close()
+
+def test_post_plano_erro_do_servidor_gera_500(servico):
+    with patch("PlanService.MealPlanGenerator.gerar_cardapio", side_effect=MemoryError()):
+        status, corpo = _post(servico, PACIENTE)
+
+    assert status == 500
+    assert corpo["erro"] == "Erro interno: MemoryError"
+    assert servico.saude()["em_andamento"] == 0
+
+def test_post_plano_recusa_corpo_grande_com_413(servico):
+    servico.max_corpo = 100
+
+    status, corpo = _post(servico, PACIENTE)
+
+    assert status == 413
+    assert "100 bytes" in corpo["erro"]
+
+def test_post_plano_recusa_com_503_quando_lotado(servico):
+    liberar = threading.Event()
+    ocupado = threading.Event()
+
+    def gerar_cardapio_lento(self):
+        ocupado.set()
+        liberar.wait(5)
+
+    with patch("PlanService.MealPlanGenerator.gerar_cardapio", gerar_cardapio_lento):
+        primeira = threading.Thread(target=_post, args=(servico, PACIENTE))
+        primeira.start()
+        ocupado.wait(5)
+
+        status, corpo = _post(servico, PACIENTE)
+        assert status == 503
+        assert servico.saude()["rejeitados"] == 1
+
+        liberar.set()
+        primeira.join(5)
+
+    assert servico.saude()["em_andamento"] == 0
+    status, corpo = _post(servico, [PACIENTE, PACIENTE])  # lote maior que a capacidade: nunca caberia
+    assert status == 413
+    assert "capacidade" in corpo["erro"]
+    assert servico.saude()["rejeitados"] == 1
+    assert _post(servico, [PACIENTE])[0] == 200
@@ -0,0 +1,31 @@
+from PlannerBenchmark import PlannerBenchmark, comparar
+
+def _resultado(segundos, fitness, avaliacoes_por_segundo=1000.0):
+    return {"resumo": {"batch": {
+        "segundos_por_refeicao": segundos, "segundos_por_cardapio": segundos * 6,
+        "avaliacoes_por_segundo": avaliacoes_por_segundo, "melhor_fitness_medio": fitness,
+    }}}
+
+def test_comparar_aponta_regressao_de_tempo_e_de_fitness():
+    base = _resultado(0.02, -100.0)
+
+    assert comparar(_resultado(0.021, -100.5), base) == []
+    regressoes = comparar(_resultado(0.05, -120.0, 400.0), base)
+    assert len(regressoes) == 4
+    assert all(r.startswith("batch:") for r in regressoes)
+
+def test_resumo_agrega_por_solver():
+    planner = [
+        {"solver": "ga", "segundos": 0.1, "avaliacoes": 100, "melhor_fitness": -10.0, "gap_otimo": 2.0, "pico_memoria_bytes": 10},
+        {"solver": "ga", "segundos": 0.3, "avaliacoes": 300, "melhor_fitness": -20.0, "gap_otimo": 0.0, "pico_memoria_bytes": 30},
+        {"solver": "exhaustive", "segundos": 0.01, "avaliacoes": 500, "melhor_fitness": -8.0, "gap_otimo": 0.0, "pico_memoria_bytes": None},
+    ]
+    cardapio = [{"solver": "ga", "segundos": 1.5}, {"solver": "exhaustive", "segundos": 0.05}]
+
+    resumo = PlannerBenchmark.resumo(planner, cardapio)
+
+    assert resumo["ga"]["avaliacoes_por_segundo"] == 1000.0
+    assert resumo["ga"]["gap_otimo_medio"] == 1.0
+    assert resumo["ga"]["pico_memoria_bytes"] == 30
+    assert resumo["exhaustive"]["pico_memoria_bytes"] is None
+    assert resumo["exhaustive"]["segundos_por_cardapio"] == 0.05